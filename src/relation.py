@@ -1,6 +1,936 @@
+import json
+import time
+from collections import OrderedDict
+from collections import deque
+from hashlib import sha256
 from set_theory import Set
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 ARROW = '\u2192'
+CLOSURE_CACHE_SIZE = 4096
+CLOSURE_BATCH_SIZE = 1024
+NUMPY_BATCH_THRESHOLD = 256
+PROGRESS_INTERVAL = 0.1
+NORMAL_FORMS = ['1NF', '2NF', '3NF', 'BCNF']
+
+
+class RelTimeout(TimeoutError):
+    """An exception raised when an algorithm on a relation is cancelled
+    or runs past its deadline, carrying any partial result."""
+
+    def __init__(self, operation, partial=None):
+        """Construct a timeout.
+
+        Parameters:
+            operation(str): the name of the algorithm interrupted
+            partial: the result found so far, or None if there is none
+        """
+        super().__init__(f'{operation} was cancelled')
+        self.operation = operation
+        self.partial = partial
+
+
+class CancelToken(object):
+    """A class which signals to long-running algorithms on a relation
+    that they should stop, either once cancelled or once a deadline
+    has passed. Algorithms check the token in their inner loops and
+    raise RelTimeout when it has expired. Each check also reports the
+    progress of the algorithm to an optional callback."""
+
+    def __init__(self, timeout=None, progress=None,
+                 interval=PROGRESS_INTERVAL):
+        """Construct a cancellation token.
+
+        Parameters:
+            timeout(float>0): the number of seconds until the token
+            expires. None by default, so it only expires once cancelled.
+            progress: a function called with the phase, the number of
+            items processed and the estimated total number of items.
+            None by default. Called from the thread of the algorithm.
+            interval(float>=0): the minimum number of seconds between
+            calls to progress for the same phase.
+        """
+        self._cancelled = False
+        self._deadline = None
+        if timeout is not None:
+            self._deadline = time.monotonic() + timeout
+        self._progress = progress
+        self._interval = interval
+        self._next_report = {}
+
+    def check(self, phase, processed, total):
+        """Reports the progress of an algorithm, unless the phase was
+        reported within the last interval, and determines whether the
+        algorithm should stop.
+
+        Parameters:
+            phase(str): the name of the algorithm running
+            processed(int): the number of items processed so far
+            total(int): the estimated total number of items, which may
+            grow as the algorithm finds more work
+
+        Returns:
+            (bool): True iff the token has expired
+        """
+        if self._progress is not None:
+            now = time.monotonic()
+            if now >= self._next_report.get(phase, 0):
+                self._next_report[phase] = now + self._interval
+                self._progress(phase, processed, max(processed, total))
+        return self.expired()
+
+    def cancel(self):
+        """Expire the token. Safe to call from another thread."""
+        self._cancelled = True
+
+    def expired(self):
+        """Returns True iff the token is cancelled or past its deadline.
+
+        Returns:
+            (bool): True if algorithms should stop
+        """
+        if self._cancelled:
+            return True
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self._cancelled = True
+        return self._cancelled
+
+
+class AttributeUniverse(object):
+    """A class which maps each attribute of a relation to a bit position,
+    such that a set of attributes can be encoded as an integer mask."""
+
+    def __init__(self, *args):
+        """Construct an attribute universe, assigning bit positions in
+        the order in which the attributes are given.
+
+        Parameters:
+            args: an attribute of the relation.
+        """
+        self._attributes = []
+        self._bits = {}
+        self.extend(args)
+
+    def extend(self, attributes):
+        """Assign a bit position to each attribute not already in the
+        universe.
+
+        Parameters:
+            attributes(list): A list of attributes.
+        """
+        for attr in attributes:
+            if attr not in self._bits:
+                self._bits[attr] = 1 << len(self._attributes)
+                self._attributes.append(attr)
+
+    def copy(self):
+        """Create a copy of the universe with the same bit positions."""
+        U_copy = AttributeUniverse()
+        U_copy._attributes = self._attributes.copy()
+        U_copy._bits = self._bits.copy()
+        return U_copy
+
+    def card(self):
+        """(int) Returns the number of attributes in the universe"""
+        return len(self._attributes)
+
+    def full(self):
+        """(int) Returns the mask containing every attribute"""
+        return (1 << len(self._attributes)) - 1
+
+    def encode(self, attributes):
+        """Returns the mask of a collection of attributes.
+
+        Parameters:
+            attributes(list): A list of attributes in the universe.
+
+        Returns:
+            (int): the mask with the bit of each attribute set
+        """
+        bits = self._bits
+        mask = 0
+        for attr in attributes:
+            mask |= bits[attr]
+        return mask
+
+    def includes(self, attributes):
+        """Returns True iff every attribute is in the universe.
+
+        Parameters:
+            attributes(list): A list of attributes.
+
+        Returns:
+            (bool): True if all attributes are in the universe
+        """
+        bits = self._bits
+        for attr in attributes:
+            if attr not in bits:
+                return False
+        return True
+
+    def decode(self, mask):
+        """Returns the attributes whose bits are set in the mask, in
+        order of bit position.
+
+        Parameters:
+            mask(int): A mask of attributes in the universe.
+
+        Returns:
+            (list): the list of attributes in the mask
+        """
+        attributes = []
+        while mask:
+            low = mask & -mask
+            attributes.append(self._attributes[low.bit_length() - 1])
+            mask ^= low
+        return attributes
+
+    def decode_set(self, mask):
+        """Returns the set of attributes whose bits are set in the mask,
+        sorted.
+
+        Parameters:
+            mask(int): A mask of attributes in the universe.
+
+        Returns:
+            (Set): the set of attributes in the mask
+        """
+        return Set(*sorted(self.decode(mask)))
+
+
+class FDTable(object):
+    """A class which stores the functional dependencies of a relation as
+    pairs of attribute masks. FD's are indexed by their (LHS, RHS) pair
+    and by the attributes on their LHS, and the sets and strings of each
+    FD are only built when first requested."""
+
+    def __init__(self, universe):
+        """Construct an empty FD table.
+
+        Parameters:
+            universe(AttributeUniverse): the universe of the masks.
+        """
+        self._universe = universe
+        self._LHS = []
+        self._RHS = []
+        self._pairs = {}
+        self._index = None
+        self._LHS_sets = None
+        self._RHS_sets = None
+        self._strings = None
+        self._string_counts = None
+
+    def __len__(self):
+        """(int) Returns the number of FD's in the table"""
+        return len(self._LHS)
+
+    def add(self, LHS_mask, RHS_mask):
+        """Append an FD to the table, updating any views and indexes
+        already built.
+
+        Parameters:
+            LHS_mask(int): A mask of attributes on the LHS of the FD.
+            RHS_mask(int): A mask of attributes on the RHS of the FD.
+        """
+        index = len(self._LHS)
+        self._LHS.append(LHS_mask)
+        self._RHS.append(RHS_mask)
+        pair = (LHS_mask, RHS_mask)
+        self._pairs[pair] = self._pairs.get(pair, 0) + 1
+        if self._index is not None:
+            attr_FDs, LHS_count, empty_LHS = self._index
+            LHS_attr = 0
+            while LHS_mask:
+                low = LHS_mask & -LHS_mask
+                LHS_mask ^= low
+                pos = low.bit_length() - 1
+                while len(attr_FDs) <= pos:
+                    attr_FDs.append([])
+                attr_FDs[pos].append(index)
+                LHS_attr += 1
+            LHS_count.append(LHS_attr)
+            if LHS_attr == 0:
+                empty_LHS.append(index)
+        if self._LHS_sets is not None:
+            self._LHS_sets.append(self._universe.decode_set(pair[0]))
+            self._RHS_sets.append(self._universe.decode_set(pair[1]))
+        if self._strings is not None:
+            FD_string = self._render(index)
+            self._strings.append(FD_string)
+            if self._string_counts is not None:
+                counts = self._string_counts
+                counts[FD_string] = counts.get(FD_string, 0) + 1
+
+    def pop(self, index):
+        """Remove the FD at the given position from the table.
+
+        Parameters:
+            index(int>=0): the position of the FD
+        """
+        pair = (self._LHS.pop(index), self._RHS.pop(index))
+        self._discard(self._pairs, pair)
+        # Positions of later FD's have shifted
+        self._index = None
+        if self._LHS_sets is not None:
+            self._LHS_sets.pop(index)
+            self._RHS_sets.pop(index)
+        if self._strings is not None:
+            FD_string = self._strings.pop(index)
+            if self._string_counts is not None:
+                self._discard(self._string_counts, FD_string)
+
+    def _discard(self, counts, key):
+        """Decrement the count of key, removing it once it reaches zero.
+
+        Parameters:
+            counts(dict): the counts of each key
+            key: the key to decrement
+        """
+        if counts[key] == 1:
+            del counts[key]
+        else:
+            counts[key] -= 1
+
+    def copy(self, universe):
+        """Create a copy of the table over the given universe, which
+        must assign the same bit positions.
+
+        Parameters:
+            universe(AttributeUniverse): the universe of the copy.
+        """
+        T_copy = FDTable(universe)
+        T_copy._LHS = self._LHS.copy()
+        T_copy._RHS = self._RHS.copy()
+        T_copy._pairs = self._pairs.copy()
+        if self._index is not None:
+            attr_FDs, LHS_count, empty_LHS = self._index
+            T_copy._index = ([FDs.copy() for FDs in attr_FDs],
+                             LHS_count.copy(), empty_LHS.copy())
+        if self._LHS_sets is not None:
+            T_copy._LHS_sets = self._LHS_sets.copy()
+            T_copy._RHS_sets = self._RHS_sets.copy()
+        if self._strings is not None:
+            T_copy._strings = self._strings.copy()
+        return T_copy
+
+    def contains(self, LHS_mask, RHS_mask):
+        """Returns True iff the table contains the FD.
+
+        Parameters:
+            LHS_mask(int): A mask of attributes on the LHS of the FD.
+            RHS_mask(int): A mask of attributes on the RHS of the FD.
+
+        Returns:
+            (bool): True if the FD is in the table. False otherwise.
+        """
+        return (LHS_mask, RHS_mask) in self._pairs
+
+    def contains_string(self, FD):
+        """Returns True iff the table contains an FD with the given
+        string representation.
+
+        Parameters:
+            FD(str): the string representation of the FD
+
+        Returns:
+            (bool): True if the FD is in the table. False otherwise.
+        """
+        if self._string_counts is None:
+            counts = {}
+            for FD_string in self.strings():
+                counts[FD_string] = counts.get(FD_string, 0) + 1
+            self._string_counts = counts
+        return FD in self._string_counts
+
+    def LHS_masks(self):
+        """(list<int>) Returns the LHS mask of each FD"""
+        return self._LHS
+
+    def RHS_masks(self):
+        """(list<int>) Returns the RHS mask of each FD"""
+        return self._RHS
+
+    def LHS_sets(self):
+        """(list<Set>) Returns the sorted LHS attributes of each FD"""
+        if self._LHS_sets is None:
+            self._build_sets()
+        return self._LHS_sets
+
+    def RHS_sets(self):
+        """(list<Set>) Returns the sorted RHS attributes of each FD"""
+        if self._RHS_sets is None:
+            self._build_sets()
+        return self._RHS_sets
+
+    def _build_sets(self):
+        """Build the LHS and RHS sets of every FD."""
+        decode_set = self._universe.decode_set
+        self._LHS_sets = [decode_set(mask) for mask in self._LHS]
+        self._RHS_sets = [decode_set(mask) for mask in self._RHS]
+
+    def strings(self):
+        """(list<str>) Returns the string representation of each FD"""
+        if self._strings is None:
+            self._strings = [self._render(index)
+                             for index in range(len(self._LHS))]
+        return self._strings
+
+    def _render(self, index):
+        """Returns the string representation of the FD at the given
+        position.
+
+        Parameters:
+            index(int>=0): the position of the FD
+
+        Returns:
+            (str): the string representation of the FD
+        """
+        decode = self._universe.decode
+        return get_FD_string(decode(self._LHS[index]),
+                             decode(self._RHS[index]))
+
+    def LHS_index(self):
+        """Returns the attribute to FD adjacency index of the table,
+        building it if necessary.
+
+        Returns:
+            (tuple<list, list, list>): for each attribute bit position,
+            the list of FD indexes with that attribute on the LHS; the
+            number of LHS attributes of each FD; and the indexes of FD's
+            with an empty LHS.
+        """
+        if self._index is None:
+            attr_FDs = [[] for _ in range(self._universe.card())]
+            LHS_count = []
+            empty_LHS = []
+            for index, FD_LHS in enumerate(self._LHS):
+                LHS_attr = 0
+                while FD_LHS:
+                    low = FD_LHS & -FD_LHS
+                    FD_LHS ^= low
+                    attr_FDs[low.bit_length() - 1].append(index)
+                    LHS_attr += 1
+                LHS_count.append(LHS_attr)
+                if LHS_attr == 0:
+                    empty_LHS.append(index)
+            self._index = (attr_FDs, LHS_count, empty_LHS)
+        attr_FDs = self._index[0]
+        while len(attr_FDs) < self._universe.card():
+            # Attributes have been added to the universe
+            attr_FDs.append([])
+        return self._index
+
+
+class ClosureCache(object):
+    """A class which memoizes closures of attribute masks for a relation,
+    evicting the least recently used closure once full."""
+
+    def __init__(self, maxsize=CLOSURE_CACHE_SIZE):
+        """Construct an empty closure cache.
+
+        Parameters:
+            maxsize(int>=0): the maximum number of closures to hold.
+            0 disables the cache.
+        """
+        self._cache = OrderedDict()
+        self._maxsize = maxsize
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, version):
+        """Returns the cached closure for key, or None if there is none.
+        All closures are discarded if the relation version has changed
+        since they were cached.
+
+        Parameters:
+            key(tuple<int, int>): the attribute mask and ignored FD index
+            version(int): the current version of the relation
+        """
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+        close_mask = self._cache.get(key)
+        if close_mask is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._cache.move_to_end(key)
+        return close_mask
+
+    def put(self, key, close_mask):
+        """Caches the closure for key, evicting the least recently used
+        closure if the cache is full.
+
+        Parameters:
+            key(tuple<int, int>): the attribute mask and ignored FD index
+            close_mask(int): the mask of the closure
+        """
+        if self._maxsize <= 0:
+            return
+        self._cache[key] = close_mask
+        if len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+
+    def resize(self, maxsize):
+        """Sets the maximum number of closures to hold, evicting the
+        least recently used closures as needed.
+
+        Parameters:
+            maxsize(int>=0): the maximum number of closures to hold.
+        """
+        self._maxsize = maxsize
+        while len(self._cache) > max(maxsize, 0):
+            self._cache.popitem(last=False)
+
+    def info(self):
+        """Returns the cache statistics.
+
+        Returns:
+            (tuple<int, int, int, int>): the number of hits, the number
+            of misses, the maximum size and the current size
+        """
+        return (self._hits, self._misses, self._maxsize, len(self._cache))
+
+
+class ClosureSession(object):
+    """A class which maintains the closure of a selection of attributes
+    of a relation as attributes are added and removed, without
+    recomputing the closure from scratch."""
+
+    def __init__(self, relation):
+        """Construct a closure session with no attributes selected.
+
+        Incremental closure:
+            the session keeps the count of LHS attributes not yet in the
+            closure of each FD, as in the linear closure. Adding an
+            attribute continues the fixpoint from these counts, and
+            records a checkpoint of the counts it decremented. Removing
+            an attribute rolls back to the checkpoint before it was
+            added, and adds back any attributes added since.
+
+        Parameters:
+            relation(Rel): the relation
+        """
+        self._relation = relation
+        self._checkpoints = []
+        self._reset()
+
+    def _reset(self):
+        """Rebuild the session from the current FD's of the relation,
+        keeping the selected attributes."""
+        relation = self._relation
+        attr_FDs, LHS_count, empty_LHS = relation._get_closure_index()
+        self._version = relation.version()
+        self._attr_FDs = attr_FDs
+        self._RHS = relation._FD_table.RHS_masks()
+        self._count = LHS_count.copy()
+        self._close_mask = 0
+        selected = [attr for attr, _, _ in self._checkpoints]
+        self._checkpoints = []
+        self._set_mask = 0
+        # FD's with an empty LHS fire immediately
+        empty_mask = 0
+        for index in empty_LHS:
+            empty_mask |= self._RHS[index]
+        self._extend(empty_mask, [])
+        for attr in selected:
+            self._add_mask(attr)
+
+    def _extend(self, new_mask, log):
+        """Extend the closure with attributes not yet in it, firing any
+        FD whose LHS is then contained in the closure.
+
+        Parameters:
+            new_mask(int): A mask of attributes not in the closure.
+            log(list<int>): the FD indexes whose counts are decremented
+            are appended to log.
+        """
+        attr_FDs = self._attr_FDs
+        RHS = self._RHS
+        count = self._count
+        close_mask = self._close_mask | new_mask
+        update = new_mask
+        while update:
+            low = update & -update
+            update ^= low
+            for index in attr_FDs[low.bit_length() - 1]:
+                count[index] -= 1
+                log.append(index)
+                if count[index] == 0:
+                    new_attr = RHS[index] & ~close_mask
+                    if new_attr:
+                        close_mask |= new_attr
+                        update |= new_attr
+        self._close_mask = close_mask
+
+    def _add_mask(self, attr_mask):
+        """Select an attribute, given by its mask.
+
+        Parameters:
+            attr_mask(int): the mask of an attribute not selected.
+        """
+        log = []
+        self._checkpoints.append((attr_mask, self._close_mask, log))
+        self._set_mask |= attr_mask
+        new_mask = attr_mask & ~self._close_mask
+        if new_mask:
+            self._extend(new_mask, log)
+
+    def _remove_masks(self, attr_mask):
+        """Deselect attributes, given by their mask.
+
+        Parameters:
+            attr_mask(int): A mask of selected attributes.
+        """
+        readd = []
+        while self._set_mask & attr_mask:
+            attr, close_mask, log = self._checkpoints.pop()
+            count = self._count
+            for index in log:
+                count[index] += 1
+            self._close_mask = close_mask
+            self._set_mask &= ~attr
+            if not attr & attr_mask:
+                readd.append(attr)
+        for attr in reversed(readd):
+            self._add_mask(attr)
+
+    def _check_version(self):
+        """Rebuild the session if the relation has been modified."""
+        if self._relation.version() != self._version:
+            self._reset()
+
+    def update(self, set_attr):
+        """Select exactly the given attributes, adding and removing
+        attributes as needed.
+
+        Parameters:
+            set_attr(Set): A set of attributes in the relation.
+
+        Returns:
+            (Set): The closure of the set of attributes.
+        """
+        error = self._relation._check_attributes(set_attr)
+        if error is not None:
+            return error
+        self._check_version()
+        set_mask = self._relation._universe.encode(set_attr.elements())
+        removed = self._set_mask & ~set_mask
+        if removed:
+            self._remove_masks(removed)
+        added = set_mask & ~self._set_mask
+        while added:
+            low = added & -added
+            added ^= low
+            self._add_mask(low)
+        return self.closure()
+
+    def add(self, attr):
+        """Select an attribute of the relation.
+
+        Parameters:
+            attr: An attribute in the relation.
+        """
+        if not self._relation._universe.includes([attr]):
+            return ValueError('must be an attribute of the relation')
+        self._check_version()
+        attr_mask = self._relation._universe.encode([attr])
+        if not attr_mask & self._set_mask:
+            self._add_mask(attr_mask)
+
+    def remove(self, attr):
+        """Deselect an attribute of the relation.
+
+        Parameters:
+            attr: An attribute in the relation.
+        """
+        if not self._relation._universe.includes([attr]):
+            return ValueError('must be an attribute of the relation')
+        self._check_version()
+        attr_mask = self._relation._universe.encode([attr])
+        if attr_mask & self._set_mask:
+            self._remove_masks(attr_mask)
+
+    def selected(self):
+        """Returns the selected attributes.
+
+        Returns:
+            (Set): the selected attributes
+        """
+        return self._relation._universe.decode_set(self._set_mask)
+
+    def closure(self):
+        """Returns the closure of the selected attributes.
+
+        Returns:
+            (Set): The closure of the selected attributes.
+        """
+        self._check_version()
+        return self._relation._universe.decode_set(self._close_mask)
+
+    def super_key(self):
+        """Return True iff the selected attributes form a superkey for
+        the relation. Return False otherwise.
+
+        Returns:
+            (bool): True if the selected attributes are a superkey
+        """
+        self._check_version()
+        return self._close_mask == self._relation._universe.full()
+
+
+class NormalFormReport(object):
+    """A class which holds the highest normal form of a relation and
+    the first violation of each normal form above 1NF."""
+
+    def __init__(self, normal_form, violations):
+        """Construct a normal form report.
+
+        Parameters:
+            normal_form(str): Either 1NF, 2NF, 3NF or BCNF
+            violations(dict): the first violation of 2NF, 3NF and BCNF,
+            in the format returned by Rel.two_NF, Rel.three_NF and
+            Rel.BCNF with reason = True, or None if there is none.
+        """
+        self._normal_form = normal_form
+        self._violations = violations
+
+    def get_normal_form(self):
+        """Returns the highest normal form of the relation.
+
+        Returns:
+            (str): Either 1NF, 2NF, 3NF or BCNF
+        """
+        return self._normal_form
+
+    def get_violation(self, normal_form=None):
+        """Returns the first violation of the given normal form. By
+        default, the normal form above the highest normal form.
+
+        Parameters:
+            normal_form(str): Either 2NF, 3NF or BCNF. None by default.
+
+        Returns:
+            (tuple): the first violation, or None if there is none
+        """
+        if normal_form is None:
+            if self._normal_form == NORMAL_FORMS[-1]:
+                return None
+            index = NORMAL_FORMS.index(self._normal_form)
+            normal_form = NORMAL_FORMS[index + 1]
+        return self._violations[normal_form]
+
+    def to_dict(self):
+        """Returns the report using only lists, strings, numbers and
+        dictionaries, suitable for serialisation.
+
+        Returns:
+            (dict): the normal form and the violation of each normal form
+        """
+        violations = {}
+        for normal_form, violation in self._violations.items():
+            if violation is not None:
+                violation = list(violation)
+            violations[normal_form] = violation
+        return {'normal_form': self._normal_form, 'violations': violations}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Construct a report from the result of to_dict.
+
+        Parameters:
+            data(dict): the normal form and the violation of each
+            normal form
+
+        Returns:
+            (NormalFormReport): the normal form report
+        """
+        violations = {}
+        for normal_form, violation in data['violations'].items():
+            if violation is not None:
+                violation = tuple(violation)
+            violations[normal_form] = violation
+        return cls(data['normal_form'], violations)
+
+    def __repr__(self):
+        """The human-readable representation of the report."""
+        return f'{self._normal_form}: {self.get_violation()}'
+
+
+class Decomposition(object):
+    """A class which holds the relations formed by decomposing a
+    relation into a normal form, and any FD's lost in doing so. The text
+    representation is only built when first requested."""
+
+    def __init__(self, normal_form, relations, lost_FD=None,
+                 key_relation=None, complete=True):
+        """Construct a decomposition.
+
+        Parameters:
+            normal_form(str): Either 3NF or BCNF
+            relations(list<Rel>): the relations formed, each with a cover
+            of its FD's. Empty if the relation is already in the normal
+            form.
+            lost_FD(list<tuple<Set, Set>>): the LHS and lost attributes
+            of each FD which is not preserved. None if not applicable.
+            key_relation(Rel): the relation added to hold a candidate
+            key. None by default.
+            complete(bool): False if each relation only lists the FD
+            used to form it. True by default.
+        """
+        self._normal_form = normal_form
+        self._relations = relations
+        self._lost_FD = lost_FD
+        self._key_relation = key_relation
+        self._complete = complete
+        self._text = None
+
+    def get_normal_form(self):
+        """Returns the normal form of the decomposition.
+
+        Returns:
+            (str): Either 3NF or BCNF
+        """
+        return self._normal_form
+
+    def is_decomposed(self):
+        """Returns False iff the relation was already in the normal form.
+
+        Returns:
+            (bool): True if the relation was decomposed
+        """
+        return len(self._relations) != 0
+
+    def get_relations(self):
+        """Returns the relations formed, each with a cover of its FD's.
+
+        Returns:
+            (list<Rel>): the relations
+        """
+        return self._relations
+
+    def get_lost_FD(self):
+        """Returns the FD's which are not preserved, as pairs of the LHS
+        and the attributes it no longer determines.
+
+        Returns:
+            (list<tuple<Set, Set>>): the FD's lost, or None if not
+            applicable
+        """
+        return self._lost_FD
+
+    def get_key_relation(self):
+        """Returns the relation added to hold a candidate key.
+
+        Returns:
+            (Rel): the key relation, or None if none was added
+        """
+        return self._key_relation
+
+    def to_dict(self):
+        """Returns the decomposition using only lists, strings and
+        dictionaries, suitable for serialisation.
+
+        Returns:
+            (dict): the normal form, relations, FD's lost and the index
+            of the key relation
+        """
+        relations = []
+        key_index = None
+        for index, rel in enumerate(self._relations):
+            dependencies = []
+            for FD_index, FD_LHS in enumerate(rel.FD_LHS()):
+                FD_RHS = rel.FD_RHS()[FD_index]
+                dependencies.append([list(FD_LHS.elements()),
+                                     list(FD_RHS.elements())])
+            relations.append({
+                'attributes': list(rel.attributes_list()),
+                'dependencies': dependencies
+            })
+            if rel is self._key_relation:
+                key_index = index
+        lost_FD = None
+        if self._lost_FD is not None:
+            lost_FD = []
+            for FD_LHS, FD_RHS in self._lost_FD:
+                lost_FD.append([list(FD_LHS.elements()),
+                                list(FD_RHS.elements())])
+        return {
+            'normal_form': self._normal_form,
+            'relations': relations,
+            'lost': lost_FD,
+            'key_relation': key_index,
+            'complete': self._complete
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Construct a decomposition from the result of to_dict.
+
+        Parameters:
+            data(dict): the normal form, relations, FD's lost and the
+            index of the key relation
+
+        Returns:
+            (Decomposition): the decomposition
+        """
+        relations = []
+        for rel_data in data['relations']:
+            # Keep the order of the attributes
+            rel = Rel()
+            rel.add_attributes(Set(*rel_data['attributes']))
+            for FD_LHS, FD_RHS in rel_data['dependencies']:
+                rel.add_FD(FD_LHS, FD_RHS)
+            relations.append(rel)
+        lost_FD = None
+        if data['lost'] is not None:
+            lost_FD = []
+            for FD_LHS, FD_RHS in data['lost']:
+                lost_FD.append((Set(*FD_LHS), Set(*FD_RHS)))
+        key_relation = None
+        if data['key_relation'] is not None:
+            key_relation = relations[data['key_relation']]
+        return cls(data['normal_form'], relations, lost_FD, key_relation,
+                   data.get('complete', True))
+
+    def get_text(self):
+        """Returns the human-readable representation of the
+        decomposition, building it on first use.
+
+        Returns:
+            (str): the relations formed and any FD's lost
+        """
+        if self._text is not None:
+            return self._text
+        if not self.is_decomposed():
+            self._text = f'Relation is already in {self._normal_form}.'
+            return self._text
+        lines = []
+        for index, rel in enumerate(self._relations, 1):
+            if rel.num_FD() == 0 and not self._complete:
+                # Dependencies are not computed
+                lines.append(f'Relation {index} : {rel.get_relation()}\n')
+            else:
+                lines.append(f'Relation {index} : {rel}\n')
+        text = '\n'.join(lines)
+        if self._lost_FD is not None:
+            text += '\nFunctional Dependencies lost: \n'
+            for index, (FD_LHS, FD_RHS) in enumerate(self._lost_FD, 1):
+                FD_string = get_FD_string(FD_LHS.elements(), FD_RHS.elements())
+                text += f'{index}. {FD_string}\n'
+            if not self._lost_FD:
+                text += 'None\n'
+        self._text = text
+        return self._text
+
+    def __repr__(self):
+        """The human-readable representation of the decomposition."""
+        return self.get_text()
 
 
 class Rel(object):
@@ -27,9 +957,15 @@ class Rel(object):
         R = list(d.keys())
         R.sort()
         self._Rel = R
-        self._FD = []
-        self._LHS_FD = []
-        self._RHS_FD = []
+        self._attr_sorted = True
+        self._universe = AttributeUniverse(*R)
+        self._FD_table = FDTable(self._universe)
+        self._shared = False
+        self._closure_cache = ClosureCache()
+        self._results_cache = None
+        self._version = 0
+        self._results = {}
+        self._results_version = 0
 
     def num_FD(self):
         """Returns the number of functional dependencies defined.
@@ -37,7 +973,7 @@ class Rel(object):
         Returns:
             (int): the number of dependencies
         """
-        return len(self._FD)
+        return len(self._FD_table)
 
     def attributes_list(self):
         """Returns a list of attributes defined in the relation"""
@@ -56,7 +992,11 @@ class Rel(object):
         """
         if not isinstance(set_attr, Set):
             return TypeError('attributes must be type Set')
+        self._own()
         self._Rel.extend(set_attr.elements())
+        self._attr_sorted = False
+        self._universe.extend(set_attr.elements())
+        self._modified()
 
     def get_relation(self):
         """ Returns a string representation of the relation.
@@ -82,7 +1022,7 @@ class Rel(object):
         """
         dependencies = ''
         # Iterate through each dependency and add to string
-        for index, FD in enumerate(self._FD, 1):
+        for index, FD in enumerate(self._FD_table.strings(), 1):
             if index != 1:
                 dependencies += '\n'
             dependencies += f'{index}. {FD}'
@@ -101,7 +1041,23 @@ class Rel(object):
         Returns:
             (bool): True if the given FD is already defined. False otherwise.
         """
-        return FD in self._FD
+        return self._FD_table.contains_string(FD)
+
+    def has_FD(self, X, A):
+        """ Returns True iff the relation contains the FD X -> A.
+        Returns False otherwise.
+
+        Parameters:
+            X(list): A list of attributes on the LHS of the FD.
+            A(list): A list of attributes on the RHS of the FD.
+
+        Returns:
+            (bool): True if the given FD is already defined. False otherwise.
+        """
+        if not self._universe.includes(X) or not self._universe.includes(A):
+            return False
+        return self._FD_table.contains(self._universe.encode(X),
+                                       self._universe.encode(A))
 
     def add_FD(self, X, A):
         """Add a non-trivial functional dependency composed of
@@ -115,17 +1071,17 @@ class Rel(object):
             return TypeError('X must be a list')
         elif not isinstance(A, list):
             return TypeError('A must be a list')
-        if not Set(*X).subset(self.attributes()):
+        if not self._universe.includes(X):
             return ValueError('X must contain attributes in the relation')
-        elif not Set(*A).subset(self.attributes()):
+        elif not self._universe.includes(A):
             return ValueError('A must contain attributes in the relation')
-        if Set(*X).intersect(Set(*A)) != Set():
+        X_mask = self._universe.encode(X)
+        A_mask = self._universe.encode(A)
+        if X_mask & A_mask:
             return ValueError('FD should be non-trivial')
-        X_sort = sorted(X)
-        A_sort = sorted(A)
-        self._LHS_FD.append(Set(*X_sort))
-        self._RHS_FD.append(Set(*A_sort))
-        self._FD.append(get_FD_string(X, A))
+        self._own()
+        self._FD_table.add(X_mask, A_mask)
+        self._modified()
 
     def FD_LHS(self):
         """Return a list of all attributes on the LHS of FD's defined
@@ -134,7 +1090,7 @@ class Rel(object):
         Returns:
             list<set>
         """
-        return self._LHS_FD
+        return self._FD_table.LHS_sets()
 
     def FD_RHS(self):
         """Return a list of all attributes on the RHS of FD's defined
@@ -143,77 +1099,292 @@ class Rel(object):
         Returns:
             list<set>
         """
-        return self._RHS_FD
+        return self._FD_table.RHS_sets()
 
     def get_FD(self, num):
         """Returns a list of attributes involved in a functional
         dependency of the relation.
 
         Parameters:
-            num(int>0): the number of the FD
-        """
-        if num <= 0 or not isinstance(num, int):
-            return TypeError('num must be a positive integer')
-        if num > len(self._FD):
-            return ValueError('There are only ' + str(len(self._FD)) + ' FDs')
-        return self._LHS_FD[num - 1].union(self._RHS_FD[num - 1])
+            num(int>0): the number of the FD
+        """
+        error = self._check_FD_num(num)
+        if error is not None:
+            return error
+        return self.FD_LHS()[num - 1].union(self.FD_RHS()[num - 1])
+
+    def copy_FD(self, other, num):
+        """Copies the specified FD from other to self, if legal.
+
+        Parameters:
+            num(int>0): the number of the FD to be copied from other
+        """
+        if num <= 0 or not isinstance(num, int):
+            return TypeError('num must be a positive integer')
+        if num > len(other._FD_table):
+            return ValueError('There are only ' + str(len(other._FD_table)) +
+                              ' FDs in other')
+        FD_LHS_other = other.FD_LHS()[num - 1].elements()
+        FD_RHS_other = other.FD_RHS()[num - 1].elements()
+        self.add_FD(FD_LHS_other, FD_RHS_other)
+
+    def _copy_FD_index(self, other, index):
+        """Copies the FD at the given position of other to self,
+        without checking that its attributes are in self.
+
+        Parameters:
+            index(int>=0): the position of the FD in other
+        """
+        decode = other._universe.decode
+        encode = self._universe.encode
+        X_mask = encode(decode(other._FD_table.LHS_masks()[index]))
+        A_mask = encode(decode(other._FD_table.RHS_masks()[index]))
+        self._add_FD_mask(X_mask, A_mask)
+
+    def remove_FD(self, num):
+        """Remove a functional dependency from the relation.
+
+        Parameters:
+            num(int>0): the number of the FD to remove
+        """
+        error = self._check_FD_num(num)
+        if error is not None:
+            return error
+        self._remove_FD_index(num - 1)
+
+    def _remove_FD_index(self, index):
+        """Remove the FD at the given position from the relation.
+
+        Parameters:
+            index(int>=0): the position of the FD
+        """
+        self._own()
+        self._FD_table.pop(index)
+        self._modified()
+
+    def reset_FD(self):
+        """Remove all functional dependencies from the relation"""
+        self._FD_table = FDTable(self._universe)
+        self._modified()
+
+    def copy(self):
+        """Create a copy of the relation and its functional
+        dependencies. The copy shares the attributes and FD's of self
+        until either relation is modified."""
+        R_copy = Rel()
+        if self._attr_sorted:
+            R_copy._Rel = self._Rel
+        else:
+            R_copy._Rel = sorted(dict.fromkeys(self._Rel))
+        R_copy._universe = self._universe
+        R_copy._FD_table = self._FD_table
+        R_copy._shared = True
+        self._shared = True
+        return R_copy
+
+    def _own(self):
+        """Give self its own copy of any attributes and FD's shared with
+        another relation. Must be called before they are modified."""
+        if self._shared:
+            self._Rel = self._Rel.copy()
+            self._universe = self._universe.copy()
+            self._FD_table = self._FD_table.copy(self._universe)
+            self._shared = False
+
+    def _check_attributes(self, set_attr):
+        """Returns an error iff set_attr is not a set of attributes in
+        the relation.
+
+        Parameters:
+            set_attr(Set): A set of attributes in the relation.
+
+        Returns:
+            (Exception): the error, or None if set_attr is valid
+        """
+        if not isinstance(set_attr, Set):
+            return TypeError('attributes must be type Set')
+        elif not self._universe.includes(set_attr.elements()):
+            return ValueError('attributes must be a subset of relation')
+        return None
+
+    def _check_FD_num(self, num):
+        """Returns an error iff num is not the number of an FD of the
+        relation.
+
+        Parameters:
+            num(int>0): the number of the FD
+
+        Returns:
+            (Exception): the error, or None if num is valid
+        """
+        if num <= 0 or not isinstance(num, int):
+            return TypeError('num must be a positive integer')
+        if num > len(self._FD_table):
+            return ValueError('There are only ' + str(len(self._FD_table)) + ' FDs')
+        return None
+
+    def _modified(self):
+        """Record that the attributes or FD's of the relation have
+        changed, invalidating any cached closures and results."""
+        self._version += 1
+
+    def _cached(self, name, compute):
+        """Returns a result computed from the current attributes and
+        FD's of the relation, computing it only once per version.
+
+        Parameters:
+            name(str): the name of the result
+            compute: a function of no arguments which computes the
+            result
+
+        Returns:
+            the result of compute
+        """
+        if self._results_version != self._version:
+            self._results = {}
+            self._results_version = self._version
+        if name not in self._results:
+            self._results[name] = compute()
+        return self._results[name]
+
+    def version(self):
+        """Returns the number of times the attributes or FD's of the
+        relation have been modified.
+
+        Returns:
+            (int): the version of the relation
+        """
+        return self._version
+
+    def closure_cache_info(self):
+        """Returns statistics of the closure cache.
+
+        Returns:
+            (tuple<int, int, int, int>): the number of hits, the number
+            of misses, the maximum size and the current size
+        """
+        return self._closure_cache.info()
+
+    def resize_closure_cache(self, maxsize):
+        """Sets the maximum number of closures cached for the relation.
+
+        Parameters:
+            maxsize(int>=0): the maximum number of closures. 0 disables
+            caching.
+        """
+        if not isinstance(maxsize, int) or maxsize < 0:
+            return TypeError('maxsize must be a non-negative integer')
+        self._closure_cache.resize(maxsize)
+
+    def set_results_cache(self, cache):
+        """Sets a persistent cache of keys, covers, normal forms and
+        decompositions for the relation, such as a ResultsCache. Copies
+        of the relation do not share it.
+
+        Parameters:
+            cache(ResultsCache): the cache, or None to stop caching
+        """
+        self._results_cache = cache
+
+    def fingerprint(self, ordered=None):
+        """Returns a fingerprint of the attributes and FD's of the
+        relation. Relations with the same attributes and the same set of
+        FD's, once split into FD's with one attribute on the RHS, have
+        the same fingerprint. If ordered = True, the order of the
+        attributes and FD's is also part of the fingerprint.
+
+        Returns:
+            (str): the hexadecimal SHA-256 digest of the relation
+        """
+        def compute():
+            decode = self._universe.decode
+            FD_RHS = self._FD_table.RHS_masks()
+            if ordered:
+                attributes = list(self._Rel)
+                FD_list = [[sorted(decode(FD_LHS)), sorted(decode(FD_RHS[index]))]
+                           for index, FD_LHS in enumerate(self._FD_table.LHS_masks())]
+            else:
+                attributes = sorted(set(self._Rel))
+                FD_set = set()
+                for index, FD_LHS in enumerate(self._FD_table.LHS_masks()):
+                    LHS_attr = tuple(sorted(decode(FD_LHS)))
+                    for RHS_attr in decode(FD_RHS[index]):
+                        FD_set.add((LHS_attr, RHS_attr))
+                FD_list = sorted(FD_set)
+            data = json.dumps([bool(ordered), attributes, FD_list])
+            return sha256(data.encode('utf-8')).hexdigest()
+        if ordered:
+            return self._cached('ordered_fingerprint', compute)
+        return self._cached('fingerprint', compute)
+
+    def _persistent(self, name, ordered, compute, encode, decode):
+        """Returns a result from the results cache of the relation,
+        computing and storing it if it is not cached.
+
+        Parameters:
+            name(str): the name of the result
+            ordered(bool): True if the result depends on the order of
+            the attributes or FD's
+            compute: a function of no arguments which computes the
+            result
+            encode: a function which converts the result for the cache
+            decode: a function which converts a cached value back
 
-    def copy_FD(self, other, num):
-        """Copies the specified FD from other to self, if legal.
+        Returns:
+            the result of compute
+        """
+        cache = self._results_cache
+        if cache is None:
+            return compute()
+        fingerprint = self.fingerprint(ordered)
+        value = cache.get(fingerprint, name)
+        if value is not None:
+            return decode(value)
+        result = compute()
+        cache.put(fingerprint, name, encode(result))
+        return result
+
+    def _encode_cover(self, R_cover):
+        """Returns the FD's of a cover of the relation as lists of
+        attributes, for the results cache.
 
         Parameters:
-            num(int>0): the number of the FD to be copied from other
+            R_cover(Rel): a relation with the attributes of self
+
+        Returns:
+            (list<list<list>>): the LHS and RHS attributes of each FD
         """
-        if num <= 0 or not isinstance(num, int):
-            return TypeError('num must be a positive integer')
-        if num > len(other._FD):
-            return ValueError('There are only ' + str(len(other._FD)) +
-                              ' FDs in other')
-        FD_LHS_other = other.FD_LHS()[num - 1].elements()
-        FD_RHS_other = other.FD_RHS()[num - 1].elements()
-        self.add_FD(FD_LHS_other, FD_RHS_other)
+        FD_RHS = R_cover.FD_RHS()
+        return [[FD_LHS.elements(), FD_RHS[index].elements()]
+                for index, FD_LHS in enumerate(R_cover.FD_LHS())]
 
-    def remove_FD(self, num):
-        """Remove a functional dependency from the relation.
+    def _decode_cover(self, FD_list):
+        """Returns a copy of the relation with the given FD's, from the
+        results cache.
 
         Parameters:
-            num(int>0): the number of the FD to remove
-        """
-        if num <= 0 or not isinstance(num, int):
-            return TypeError('num must be a positive integer')
-        if num > len(self._FD):
-            return ValueError('There are only ' + str(len(self._FD)) + ' FDs')
-        self._FD.pop(num - 1)
-        self._LHS_FD.pop(num - 1)
-        self._RHS_FD.pop(num - 1)
+            FD_list(list<list<list>>): the LHS and RHS attributes of
+            each FD
 
-    def reset_FD(self):
-        """Remove all functional dependencies from the relation"""
-        self._FD = []
-        self._LHS_FD = []
-        self._RHS_FD = []
-
-    def copy(self):
-        """Create a copy of the relation and its functional
-        dependencies."""
-        R_copy = Rel(*self._Rel)
-        R_copy._FD = self._FD.copy()
-        R_copy._LHS_FD = self._LHS_FD.copy()
-        R_copy._RHS_FD = self._RHS_FD.copy()
+        Returns:
+            (Rel): A copy of self with the FD's
+        """
+        R_copy = self.copy()
+        R_copy.reset_FD()
+        encode = R_copy._universe.encode
+        for FD_LHS, FD_RHS in FD_list:
+            R_copy._add_FD_mask(encode(FD_LHS), encode(FD_RHS))
         return R_copy
 
     def expand_FD(self):
         """Replace all FD X -> A in self, where A consists of attributes
         A1, A2,...,An, with FD's X -> A1, X -> A2,..., X -> An."""
-        R_copy = self.copy()
-        R_copy.reset_FD()
-        for index, FD in enumerate(self.FD_RHS()):
-            LHS_attr = self.FD_LHS()[index].elements()
-            for RHS_attr in FD.elements():
-                R_copy.add_FD(LHS_attr, [RHS_attr])
-        self._FD = R_copy._FD
-        self._LHS_FD = R_copy._LHS_FD
-        self._RHS_FD = R_copy._RHS_FD
+        FD_table = FDTable(self._universe)
+        for index, FD_LHS in enumerate(self._FD_table.LHS_masks()):
+            for RHS_attr in self.FD_RHS()[index].elements():
+                FD_table.add(FD_LHS, self._universe.encode([RHS_attr]))
+        self._FD_table = FD_table
+        self._modified()
 
     def closure(self, set_attr, ignore=None):
         """Find the closure of a set of attributes in a relation with
@@ -226,34 +1397,207 @@ class Rel(object):
         Returns:
             (Set): The closure of the set of attributes.
         """
-        R_copy = self.copy()
-        rel_attr = R_copy.attributes()
-        set_close = set_attr.sort()
-        if not isinstance(set_attr, Set):
-            return TypeError('attributes must be type Set')
-        elif set_close - rel_attr != Set():
-            return ValueError('attributes must be a subset of relation')
-        if rel_attr == set_close:
-            return set_close
-        if not R_copy._FD:
-            return set_close
+        error = self._check_attributes(set_attr)
+        if error is not None:
+            return error
+        skip = -1
         if ignore is not None:
             if ignore <= 0 or not isinstance(ignore, int):
                 return TypeError('ignore must be a positive integer')
-            if ignore > len(self._FD):
-                return ValueError('There are only ' + str(len(self._FD)) + ' FDs')
-            R_copy.remove_FD(ignore)
-        FD_skip = 0
-        while FD_skip != len(R_copy._FD):
-            FD_skip = 0
-            for num, FD in enumerate(R_copy.FD_LHS(), 1):
-                if FD.subset(set_close):
-                    set_close.append(R_copy.get_FD(num))
-                    R_copy.remove_FD(num)
-                    FD_skip -= 1
-                else:
-                    FD_skip += 1
-        return set_close.sort()
+            if ignore > len(self._FD_table):
+                return ValueError('There are only ' + str(len(self._FD_table)) + ' FDs')
+            skip = ignore - 1
+        set_mask = self._universe.encode(set_attr.elements())
+        return self._universe.decode_set(self._closure_mask(set_mask, skip))
+
+    def closure_session(self):
+        """Returns a session which maintains the closure of a selection
+        of attributes of the relation as the selection changes.
+
+        Returns:
+            (ClosureSession): a session with no attributes selected
+        """
+        return ClosureSession(self)
+
+    def closures(self, sets, vectorize=None):
+        """Find the closure of each of a collection of sets of attributes
+        in the relation, sharing one closure index between them. If
+        vectorize = True, the closures are computed together over NumPy
+        boolean matrices. By default, NumPy is used iff it is installed
+        and there are at least NUMPY_BATCH_THRESHOLD distinct sets.
+
+        Parameters:
+            sets(iterable<Set>): the sets of attributes in the relation.
+            vectorize(bool): whether to use NumPy. None by default.
+
+        Returns:
+            (list<Set>): the closure of each set of attributes, in order.
+        """
+        set_masks = []
+        for set_attr in sets:
+            error = self._check_attributes(set_attr)
+            if error is not None:
+                return error
+            set_masks.append(self._universe.encode(set_attr.elements()))
+        if vectorize and numpy is None:
+            return ImportError('vectorize requires NumPy')
+        # Equal sets share a closure
+        distinct = list(dict.fromkeys(set_masks))
+        if vectorize is None:
+            vectorize = numpy is not None \
+                and len(distinct) >= NUMPY_BATCH_THRESHOLD
+        if vectorize:
+            close_masks = []
+            for start in range(0, len(distinct), CLOSURE_BATCH_SIZE):
+                batch = distinct[start:start + CLOSURE_BATCH_SIZE]
+                close_masks.extend(self._matrix_closure(batch))
+        else:
+            close_masks = [self._closure_mask(set_mask)
+                           for set_mask in distinct]
+        decode_set = self._universe.decode_set
+        close_sets = {}
+        for index, set_mask in enumerate(distinct):
+            close_sets[set_mask] = decode_set(close_masks[index])
+        return [close_sets[set_mask] for set_mask in set_masks]
+
+    def _matrix_closure(self, set_masks):
+        """Find the closures of a list of masks of attributes together,
+        using NumPy.
+
+        Matrix closure:
+            the sets are the rows of a boolean matrix C, and the FD's
+            the rows of LHS and RHS matrices. An FD fires for a set once
+            its LHS is contained in the set, i.e. once the row of C.LHS^T
+            equals the size of the LHS, and the RHS of every FD fired is
+            then added to the set. Repeat until C no longer changes.
+
+        Parameters:
+            set_masks(list<int>): masks of attributes in the relation.
+
+        Returns:
+            (list<int>): the mask of the closure of each set.
+        """
+        bits = [1 << pos for pos in range(self._universe.card())]
+        if not len(self._FD_table) or not bits or not set_masks:
+            return [self._closure_mask(set_mask) for set_mask in set_masks]
+
+        def to_matrix(masks):
+            return numpy.array([[bool(mask & bit) for bit in bits]
+                                for mask in masks], dtype=bool)
+        # Floating point products use BLAS, and are exact for counts
+        # of attributes below 2**24
+        LHS = to_matrix(self._FD_table.LHS_masks()).astype(numpy.float32)
+        RHS = to_matrix(self._FD_table.RHS_masks()).astype(numpy.float32)
+        LHS_count = LHS.sum(axis=1)
+        close = to_matrix(set_masks)
+        while True:
+            fired = close.astype(numpy.float32) @ LHS.T == LHS_count
+            update = close | (fired.astype(numpy.float32) @ RHS > 0)
+            if numpy.array_equal(update, close):
+                break
+            close = update
+        close_masks = []
+        for row in close.tolist():
+            close_mask = 0
+            for pos, flag in enumerate(row):
+                if flag:
+                    close_mask |= bits[pos]
+            close_masks.append(close_mask)
+        return close_masks
+
+    def _closure_mask(self, set_mask, skip=-1):
+        """Find the closure of a mask of attributes in the relation,
+        using the closure cache where possible.
+
+        Parameters:
+            set_mask(int): A mask of attributes in the relation.
+            skip(int): the index of an FD to ignore. -1 by default.
+
+        Returns:
+            (int): The mask of the closure of the attributes.
+        """
+        key = (set_mask, skip)
+        close_mask = self._closure_cache.get(key, self._version)
+        if close_mask is None:
+            close_mask = self._linear_closure(set_mask, skip)
+            self._closure_cache.put(key, close_mask)
+        return close_mask
+
+    def _linear_closure(self, set_mask, skip=-1, disabled=(), target=None):
+        """Find the closure of a mask of attributes in the relation.
+
+        Linear closure:
+            each FD keeps a count of LHS attributes not yet in the
+            closure. When an attribute joins the closure, the count of
+            every FD with that attribute on its LHS is decremented, and
+            an FD fires once its count reaches zero. Every attribute and
+            FD is therefore visited at most once. FD's are ignored by
+            starting their count below zero, so that it never reaches
+            zero.
+
+        Parameters:
+            set_mask(int): A mask of attributes in the relation.
+            skip(int): the index of an FD to ignore. -1 by default.
+            disabled(list<int>): the indexes of further FD's to ignore.
+            target(int): if given, stop as soon as the closure contains
+            these attributes. None by default.
+
+        Returns:
+            (int): The mask of the closure of the attributes, or of a
+            subset of it containing target.
+        """
+        attr_FDs, LHS_count, empty_LHS = self._get_closure_index()
+        RHS_mask = self._FD_table.RHS_masks()
+        count = LHS_count.copy()
+        if skip >= 0:
+            count[skip] = -1
+        for index in disabled:
+            count[index] = -1
+        close_mask = set_mask
+        update = set_mask
+        # FD's with an empty LHS fire immediately
+        for index in empty_LHS:
+            if count[index] == 0:
+                close_mask |= RHS_mask[index]
+        if target is not None and not target & ~close_mask:
+            return close_mask
+        update |= close_mask
+        while update:
+            low = update & -update
+            update ^= low
+            for index in attr_FDs[low.bit_length() - 1]:
+                count[index] -= 1
+                if count[index] == 0:
+                    new_mask = RHS_mask[index] & ~close_mask
+                    if new_mask:
+                        close_mask |= new_mask
+                        update |= new_mask
+                        if target is not None and not target & ~close_mask:
+                            return close_mask
+        return close_mask
+
+    def _get_closure_index(self):
+        """Returns the index used to compute closures.
+
+        Returns:
+            (tuple<list, list, list>): for each attribute bit position,
+            the list of FD indexes with that attribute on the LHS; the
+            number of LHS attributes of each FD; and the indexes of FD's
+            with an empty LHS.
+        """
+        return self._FD_table.LHS_index()
+
+    def _add_FD_mask(self, X_mask, A_mask):
+        """Add a non-trivial functional dependency given by masks of
+        attributes in the relation.
+
+        Parameters:
+            X_mask(int): A mask of attributes on the LHS of the FD.
+            A_mask(int): A mask of attributes on the RHS of the FD.
+        """
+        self._own()
+        self._FD_table.add(X_mask, A_mask)
+        self._modified()
 
     def trans_FD(self, num):
         """Return True iff given FD is the result of a transitivity; i.e., for X -> Y
@@ -265,15 +1609,26 @@ class Rel(object):
         Returns:
             (bool): True if FD is transitive. False otherwise.
         """
-        if num <= 0 or not isinstance(num, int):
-            return TypeError('num must be a positive integer')
-        if num > len(self._FD):
-            return ValueError('There are only ' + str(len(self._FD)) + ' FDs')
-        FD_LHS = self.FD_LHS()[num - 1]  # X
-        FD_RHS = self.FD_RHS()[num - 1]  # Y
-        if FD_RHS.subset(self.closure(FD_LHS, num)):
-            return True
-        return False
+        error = self._check_FD_num(num)
+        if error is not None:
+            return error
+        return self._trans_FD_index(num - 1)
+
+    def _trans_FD_index(self, index):
+        """Return True iff the FD at the given position is implied by
+        the other FD's of the relation. Return False otherwise.
+
+        Parameters:
+            index(int>=0): the position of the FD
+
+        Returns:
+            (bool): True if FD is transitive. False otherwise.
+        """
+        FD_LHS = self._FD_table.LHS_masks()[index]  # X
+        FD_RHS = self._FD_table.RHS_masks()[index]  # Y
+        if FD_RHS & ~self._closure_mask(FD_LHS, index):
+            return False
+        return True
 
     def union_FD(self):
         """Return a copy of the relation with the set of FD's condensed.
@@ -285,86 +1640,255 @@ class Rel(object):
         """
         R_copy = self.copy()
         R_copy.reset_FD()
-        FD_indexed = []
-        for FD_1_LHS in self.FD_LHS():
-            if FD_1_LHS not in FD_indexed:
-                FD_indexed.append(FD_1_LHS)
-                FD_RHS_tot = Set()
-                for index, FD_2_LHS in enumerate(self.FD_LHS()):
-                    if FD_2_LHS == FD_1_LHS:
-                        FD_RHS_tot.append(self.FD_RHS()[index])
-                R_copy.add_FD(FD_1_LHS.elements(), FD_RHS_tot.elements())
+        # Map each distinct LHS to the union of its RHS, in order
+        FD_indexed = {}
+        FD_RHS = self._FD_table.RHS_masks()
+        for index, FD_LHS in enumerate(self._FD_table.LHS_masks()):
+            FD_indexed[FD_LHS] = FD_indexed.get(FD_LHS, 0) | FD_RHS[index]
+        for FD_LHS, FD_RHS in FD_indexed.items():
+            R_copy._add_FD_mask(FD_LHS, FD_RHS)
         return R_copy
 
-    def infer_FD(self, set_attr):
+    def infer_FD(self, set_attr, token=None):
         """Returns a relation whose attributes are in the closure of
         set_attr on self, including all non-trivial FD's from self which
         hold on the new relation.
 
         Parameters:
             set_attr(Set): A set of attributes in the relation.
+            token(CancelToken): raises RelTimeout carrying the relation
+            with the FD's inferred so far once expired. None by default.
 
         Returns:
             (Rel): A new relation containing all FD's inferred from
             set_attr on self, with union.
         """
-        if not isinstance(set_attr, Set):
-            return TypeError('attributes must be type Set')
-        elif set_attr - self.attributes() != Set():
-            return ValueError('attributes must be a subset of relation')
-        R_new = Rel(*set_attr.elements())
-        num = 0
-        for FD_LHS in self.FD_LHS():  # Greatly improve the efficacy of this
-            if FD_LHS.card() > num:
-                num = FD_LHS.card()
-        set_ps = set_attr.power_set(num + 1)[1:-1]
-        for FD_LHS in set_ps:
-            FD_RHS = self.closure(FD_LHS).intersect(set_attr) - FD_LHS
-            if FD_RHS.card() != 0:
-                R_new.add_FD(FD_LHS.elements(), FD_RHS.elements())
+        error = self._check_attributes(set_attr)
+        if error is not None:
+            return error
+        set_mask = self._universe.encode(set_attr.elements())
+        return self._infer_FD_mask(set_mask, token)
+
+    def _infer_FD_mask(self, attr_mask, token=None):
+        """Analogous to infer_FD, given a mask of attributes in the
+        relation.
+
+        Parameters:
+            attr_mask(int): A mask of attributes in the relation.
+            token(CancelToken): the cancellation token. None by default.
+
+        Returns:
+            (Rel): A new relation containing all FD's inferred from
+            the attributes on self, with union.
+        """
+        decode = self._universe.decode
+        R_new = Rel(*decode(attr_mask))
+        encode = R_new._universe.encode
+        try:
+            for FD_LHS, FD_RHS in self._project_FD(attr_mask, token):
+                R_new._add_FD_mask(encode(decode(FD_LHS)),
+                                   encode(decode(FD_RHS)))
+        except RelTimeout as timeout:
+            timeout.partial = R_new
+            raise
         return R_new
 
-    def min_cover(self, union=None):
+    def _project_FD(self, attr_mask, token=None):
+        """Generate a cover of the FD's which hold on a subset of the
+        attributes of the relation, each with a reduced LHS.
+
+        FD projection:
+            candidate LHS's X are enumerated by size, and each is only
+            extended by an attribute a not in the closure of X, since
+            otherwise the closure of any superset containing X & a is
+            that of the same superset without a. Likewise, any X with
+            an attribute in the closure of the rest of X is skipped
+            together with its supersets. The closure of X & a is found
+            from the closure of X, and X -> Y is generated for the
+            attributes Y of the subset in the closure of X but not in
+            the closure of any X - b.
+
+        Parameters:
+            attr_mask(int): A mask of attributes in the relation.
+            token(CancelToken): the cancellation token. None by default.
+
+        Yields:
+            (tuple<int, int>): the LHS and RHS masks of an FD
+        """
+        LHS_union = 0
+        for FD_LHS in self._FD_table.LHS_masks():
+            LHS_union |= FD_LHS
+        # Attributes on no LHS add nothing to the closure of an LHS
+        cand_mask = attr_mask & LHS_union
+        cand_bits = []
+        while cand_mask:
+            low = cand_mask & -cand_mask
+            cand_mask ^= low
+            cand_bits.append(low)
+        closures = {0: 0}
+        level = []
+        for pos, bit in enumerate(cand_bits):
+            level.append((bit, 0, pos))
+        examined = 0
+        while level:
+            next_level = []
+            for item, (set_mask, parent, last) in enumerate(level):
+                # Estimate the total from the candidates found so far
+                if token is not None and token.check(
+                        'infer_FD', examined + item,
+                        examined + len(level) + len(next_level)):
+                    raise RelTimeout('infer_FD')
+                sub_union = 0
+                independent = True
+                rest = set_mask if parent else 0
+                while rest:
+                    low = rest & -rest
+                    rest ^= low
+                    sub_close = closures.get(set_mask & ~low)
+                    if sub_close is None or sub_close & low:
+                        # An attribute is determined by the rest
+                        independent = False
+                        break
+                    sub_union |= sub_close
+                if not independent:
+                    continue
+                close_mask = self._closure_mask(closures[parent] | set_mask)
+                closures[set_mask] = close_mask
+                FD_RHS = close_mask & attr_mask & ~set_mask & ~sub_union
+                if FD_RHS:
+                    yield (set_mask, FD_RHS)
+                for pos in range(last + 1, len(cand_bits)):
+                    bit = cand_bits[pos]
+                    if not bit & close_mask:
+                        next_level.append((set_mask | bit, set_mask, pos))
+            examined += len(level)
+            level = next_level
+
+    def min_cover(self, union=None, token=None):
         """Return the minimal cover for a relation. If union = True,
-        return minmal cover with union.
+        return minmal cover with union. If token expires, raises
+        RelTimeout carrying a relation with an equivalent cover which
+        may not be minimal.
 
         Minimal cover definition:
             The set of non-trivial functional dependencies defined over
             the relation, with any redundancies removed.
         """
+        name = 'min_cover_union' if union else 'min_cover'
+        return self._persistent(name, True,
+                                lambda: self._min_cover(union, token),
+                                self._encode_cover, self._decode_cover)
+
+    def _min_cover(self, union=None, token=None):
+        """Computes the minimal cover for a relation, with union iff
+        union = True."""
         R_copy = self.copy()
         R_empty = self.copy()
         R_empty.reset_FD()
         # Step 1 - simplify RHS
         R_copy.expand_FD()
         # Step 2 - simplify LHS
-        for index, FD_LHS in enumerate(R_copy.FD_LHS()):
-            FD_RHS = R_copy.FD_RHS()[index]
-            FD_LHS_copy = FD_LHS.copy()
-            if FD_LHS.card() > 1:
-                FD_LHS_ele = FD_LHS.elements()
-                for attr in FD_LHS_ele:
-                    if FD_LHS_copy.card() > 1:  # Use intersection
-                        if FD_LHS_copy.subset(self.closure(FD_LHS_copy - Set(attr))):
-                            FD_LHS_copy -= Set(attr)
-            R_empty.add_FD(FD_LHS_copy.elements(), FD_RHS.elements())
-        # Step 3 - remove redundancies
-        R_copy = R_empty.copy()
-        num_FDs_rmvd = 0
-        for index, FD_1_LHS in enumerate(R_empty.FD_LHS()):
-            R_copy_index = index - num_FDs_rmvd + 1
-            if R_copy.trans_FD(R_copy_index):
-                R_copy.remove_FD(R_copy_index)
-                num_FDs_rmvd += 1
-            else:
-                FD_1_RHS = R_empty.FD_RHS()[index]
-                if FD_1_RHS.subset(R_copy.closure(FD_1_LHS, R_copy_index)):
-                    R_copy.remove_FD(R_copy_index)
-                    num_FDs_rmvd += 1
+        num_FD = R_copy.num_FD()
+        for index, FD_LHS in enumerate(R_copy._FD_table.LHS_masks()):
+            if token is not None and token.check('min_cover', index,
+                                                 2 * num_FD):
+                raise RelTimeout('min_cover', R_copy)
+            FD_RHS = R_copy._FD_table.RHS_masks()[index]
+            FD_LHS_copy = FD_LHS
+            for attr in R_copy.FD_LHS()[index].elements():
+                attr_mask = self._universe.encode([attr])
+                if FD_LHS_copy != attr_mask:  # More than one attribute
+                    FD_LHS_rem = FD_LHS_copy & ~attr_mask
+                    close_mask = self._linear_closure(FD_LHS_rem,
+                                                      target=attr_mask)
+                    if attr_mask & close_mask:
+                        FD_LHS_copy = FD_LHS_rem
+            R_empty._add_FD_mask(FD_LHS_copy, FD_RHS)
+        # Step 3 - remove redundancies, disabling each redundant FD
+        # rather than removing it from the closure index
+        FD_LHS_masks = R_empty._FD_table.LHS_masks()
+        FD_RHS_masks = R_empty._FD_table.RHS_masks()
+        disabled = []
+        for index, FD_LHS in enumerate(FD_LHS_masks):
+            if token is not None and token.check('min_cover', num_FD + index,
+                                                 2 * num_FD):
+                raise RelTimeout('min_cover', R_empty)
+            close_mask = R_empty._linear_closure(FD_LHS, index, disabled,
+                                                 FD_RHS_masks[index])
+            if not FD_RHS_masks[index] & ~close_mask:
+                disabled.append(index)
+        R_copy.reset_FD()
+        disabled.append(len(FD_LHS_masks))
+        start = 0
+        for stop in disabled:
+            for index in range(start, stop):
+                R_copy._add_FD_mask(FD_LHS_masks[index], FD_RHS_masks[index])
+            start = stop + 1
         if union:
             return R_copy.union_FD()
         return R_copy
 
+    def minimum_cover(self, token=None):
+        """Return a cover for the relation with the fewest FD's
+        possible, using the algorithm of Maier.
+
+        Minimum cover:
+            starting from the minimal cover with union, FD's are grouped
+            into classes whose LHS's have the same closure. Within a
+            class E, if X -> U and Y -> V are FD's such that Y is in the
+            closure of X under the FD's outside E, then X -> U is
+            removed and Y -> V is replaced by Y -> UV.
+
+        Parameters:
+            token(CancelToken): raises RelTimeout carrying a relation
+            with an equivalent cover once expired. None by default.
+
+        Returns:
+            (Rel): A copy of self but with a minimum cover
+        """
+        return self._persistent('minimum_cover', True,
+                                lambda: self._minimum_cover(token),
+                                self._encode_cover, self._decode_cover)
+
+    def _minimum_cover(self, token=None):
+        """Computes the minimum cover for minimum_cover."""
+        try:
+            R_min = self.min_cover(True, token)
+        except RelTimeout as timeout:
+            raise RelTimeout('minimum_cover', timeout.partial) from timeout
+        FD_LHS = R_min._FD_table.LHS_masks()
+        FD_RHS = list(R_min._FD_table.RHS_masks())
+        # Group FD's by the closure of their LHS
+        classes = {}
+        for index, LHS_mask in enumerate(FD_LHS):
+            close_mask = R_min._closure_mask(LHS_mask)
+            classes.setdefault(close_mask, []).append(index)
+        removed = set()
+        for class_index, E in enumerate(classes.values()):
+            if len(E) == 1:
+                continue
+            if token is not None and token.check(
+                    'minimum_cover', class_index, len(classes)):
+                raise RelTimeout('minimum_cover', R_min)
+            for index in E:
+                # Closure under the FD's outside the class
+                close_mask = R_min._linear_closure(FD_LHS[index], disabled=E)
+                for other in E:
+                    if other == index or other in removed:
+                        continue
+                    if not FD_LHS[other] & ~close_mask:
+                        # LHS of index directly determines LHS of other
+                        FD_RHS[other] = (FD_RHS[other] | FD_RHS[index]) \
+                            & ~FD_LHS[other]
+                        removed.add(index)
+                        break
+        R_copy = R_min.copy()
+        R_copy.reset_FD()
+        for index, LHS_mask in enumerate(FD_LHS):
+            if index not in removed:
+                R_copy._add_FD_mask(LHS_mask, FD_RHS[index])
+        return R_copy
+
     def super_key(self, set_attr):
         """Return True iff set_attr is a superkey for the relation.
         Return False otherwise.
@@ -376,62 +1900,209 @@ class Rel(object):
             A set of attributes is a superkey for the relation if
             its closure contains all attributes in the relation.
         """
-        rel_attr = self.attributes()
-        if not isinstance(set_attr, Set):
-            return TypeError('attributes must be type Set')
-        elif set_attr - rel_attr != Set():
-            return ValueError('attributes must be a subset of relation')
-        if self.closure(set_attr) == rel_attr:
+        error = self._check_attributes(set_attr)
+        if error is not None:
+            return error
+        set_mask = self._universe.encode(set_attr.elements())
+        if self._closure_mask(set_mask) == self._universe.full():
             return True
         else:
             return False
 
-    def keys(self):
-        """Return a set of all candidate keys for the relation.
+    def keys(self, token=None):
+        """Return a set of all candidate keys for the relation, ordered
+        by size. If token expires, raises RelTimeout carrying the list
+        of keys found so far.
 
         Candidate key definition:
             A set of attributes is a candidate key for the relation if
             it is a minimal superkey.
         """
+        K = [self._universe.decode_set(key)
+             for key in self._key_masks(token)]
+        K.sort(key=lambda key: (key.card(), key.elements()))
+        return Set(*K)
+
+    def _key_masks(self, token=None):
+        """Returns the list of masks of every candidate key for the
+        relation, enumerated once per version.
+
+        Parameters:
+            token(CancelToken): the cancellation token. None by default.
+
+        Returns:
+            (list<int>): the masks of the candidate keys
+        """
+        def compute():
+            # Continue from any keys found by _prime_mask
+            found = self._results.pop('partial_keys', ())
+            return self._persistent(
+                'keys', False,
+                lambda: list(self._iter_key_masks(token, found)),
+                lambda K: [self._universe.decode(key) for key in K],
+                lambda K: [self._universe.encode(key) for key in K]
+            )
+        return self._cached('keys', compute)
+
+    def iter_keys(self, token=None):
+        """Generate each candidate key for the relation as soon as it
+        is found, so that callers can stop early. The relation should
+        not be modified until the generator is exhausted or discarded.
+        Keys already enumerated for this version are not found again,
+        and the keys are kept for the version once all are generated.
+
+        Parameters:
+            token(CancelToken): raises RelTimeout carrying the list of
+            keys found so far once expired. None by default.
+
+        Yields:
+            (Set): a candidate key for the relation
+        """
+        if self._results_version == self._version and 'keys' in self._results:
+            # Already enumerated for this version
+            for key in self._results['keys']:
+                yield self._universe.decode_set(key)
+            return
         K = []
-        # Add any attributes to candidate key not on RHS of FD's
-        k = self.attributes()
-        for FD in self.FD_RHS():
-            k -= FD
-        # Check to see if any FD's have been defined
-        if self.num_FD() == 0:
-            # Trivial case
-            return Set(k)
-        # Iterate through each FD (at least one exists)
-        for FD in self.FD_LHS():
-            k_copy = k.sort()
-            k_copy.append(FD)
-            if not self.super_key(k_copy):
-                k_rem = self.attributes() - self.closure(k_copy)
-                if k_rem.card() == 1:
-                    K.append(k_copy.union(k_rem))
+        for key in self._iter_key_masks(token):
+            K.append(key)
+            yield self._universe.decode_set(key)
+        # Every key was enumerated, so keep them for this version
+        if self._results_version != self._version:
+            self._results = {}
+            self._results_version = self._version
+        self._results.pop('partial_keys', None)
+        self._results['keys'] = K
+
+    def _iter_key_masks(self, token=None, found=()):
+        """Generate the mask of each candidate key for the relation.
+
+        Key enumeration:
+            uses the algorithm of Lucchesi and Osborn. A first key is
+            found by minimising the set of all attributes. Then for each
+            key K and FD X -> Y, the set X & (K - Y) is a superkey; if
+            it contains no key found so far, it is minimised into a new
+            key. Every candidate key is found, in time polynomial in the
+            number of keys.
+
+        Parameters:
+            token(CancelToken): the cancellation token. None by default.
+            found(list<int>): the masks of the first keys generated by an
+            earlier enumeration which stopped early. These are generated
+            again, and the enumeration continues from them as it would
+            have done. Empty by default.
+
+        Yields:
+            (int): the mask of a candidate key
+        """
+        K = list(found)
+        if not K:
+            K.append(self._minimise_key(self._universe.full()))
+        yield from K[:]
+        index = 0
+        while index < len(K):
+            key = K[index]
+            FD_RHS = self._FD_table.RHS_masks()
+            for FD_index, FD_LHS in enumerate(self._FD_table.LHS_masks()):
+                # Every key found so far is yet to be expanded
+                if token is not None and token.check('keys', index, len(K)):
+                    raise RelTimeout('keys', [self._universe.decode_set(key)
+                                              for key in K])
+                set_mask = FD_LHS | (key & ~FD_RHS[FD_index])
+                for other in K:
+                    if other & set_mask == other:
+                        # Already contains a known key
+                        break
                 else:
-                    k_minus = Set()
-                    for i in range(1, 4):
-                        if k_rem.card() >= i:
-                            for attr in k_rem.partition(i):
-                                k_temp = k_copy.union(attr)
-                                if self.super_key(k_temp):
-                                    K.append(k_temp.sort())
-                                    if i == 1:
-                                        k_minus.append(attr)
-                            k_rem -= k_minus
+                    K.append(self._minimise_key(set_mask))
+                    yield K[-1]
+            index += 1
+
+    def _minimise_key(self, set_mask):
+        """Returns a candidate key contained in the given superkey, by
+        removing each attribute which is not needed.
+
+        Parameters:
+            set_mask(int): A mask of a superkey of the relation.
+
+        Returns:
+            (int): The mask of a candidate key.
+        """
+        rel_mask = self._universe.full()
+        core, never_prime = self._classify_attributes()
+        # Attributes on no LHS can always be removed from a superkey,
+        # and attributes on no RHS never can
+        set_mask &= ~never_prime
+        removable = set_mask & ~core
+        while removable:
+            low = removable & -removable
+            removable ^= low
+            if self._closure_mask(set_mask & ~low) == rel_mask:
+                set_mask &= ~low
+        return set_mask
+
+    def _classify_attributes(self):
+        """Classifies the attributes of the relation by where they
+        occur in its FD's.
+
+        Returns:
+            (tuple<int, int>): the mask of core attributes, which are
+            on no RHS and so belong to every key; and the mask of
+            attributes which are on some RHS but no LHS, and so belong
+            to no key
+        """
+        def classify():
+            LHS_union = 0
+            RHS_union = 0
+            FD_RHS = self._FD_table.RHS_masks()
+            for index, FD_LHS in enumerate(self._FD_table.LHS_masks()):
+                LHS_union |= FD_LHS
+                RHS_union |= FD_RHS[index]
+            core = self._universe.full() & ~RHS_union
+            return (core, RHS_union & ~LHS_union)
+        return self._cached('classes', classify)
+
+    def _prime_mask(self, token=None):
+        """Returns the mask of prime attributes for the relation,
+        computed once per version. Keys are only enumerated if the
+        attribute classification leaves any attribute undecided, and
+        are kept for _key_masks, which continues from the keys found if
+        the enumeration stopped early.
+
+        Parameters:
+            token(CancelToken): the cancellation token. None by default.
+
+        Returns:
+            (int): the mask of the prime attributes
+        """
+        def compute():
+            core, never_prime = self._classify_attributes()
+            undecided = self._universe.full() & ~core & ~never_prime
+            if not undecided:
+                return core
+            if self._closure_mask(core) == self._universe.full():
+                # The core is the only key
+                return core
+            prime = core
+            if 'keys' in self._results:
+                key_masks = self._results['keys']
             else:
-                K.append(k_copy.sort())
-        K_remove = []
-        for key_1 in K:
-            for key_2 in K:
-                if key_2.subset(key_1) and key_2 != key_1:
-                    K_remove.append(key_1)
+                key_masks = self._iter_key_masks(token)
+            K = []
+            for key in key_masks:
+                K.append(key)
+                prime |= key
+                if prime & undecided == undecided:
+                    # Every attribute is prime, so _key_masks can continue
+                    # from the keys found if it needs the others
+                    if 'keys' not in self._results:
+                        self._results['partial_keys'] = K
                     break
-        for key in K_remove:
-            K.remove(key)
-        return Set(*K)
+            else:
+                # Every key was enumerated, so keep them for _key_masks
+                self._results['keys'] = K
+            return prime
+        return self._cached('prime', compute)
 
     def prime_attr(self, attr):
         """Return True iff attr is a prime attribute for the relation.
@@ -444,16 +2115,12 @@ class Rel(object):
             An attribute is prime iff it is a participant in a candidate
             key.
         """
-        rel_attr = self.attributes()
-        if not Set(attr).subset(rel_attr):
+        if not self._universe.includes([attr]):
             return ValueError('must be an attribute of the relation')
-        K = Set()
-        for key in self.keys().elements():
-            K.append(key)
-        if Set(attr).subset(K):
+        attr_mask = self._universe.encode([attr])
+        if attr_mask & self._prime_mask():
             return True
-        else:
-            return False
+        return False
 
     def key_subset(self, set_attr, reason=None):
         """Return True iff set_attr is a proper subset of a candidate
@@ -463,21 +2130,39 @@ class Rel(object):
         Parameters:
             set_attr(Set): A set of attributes in the relation.
         """
-        rel_attr = self.attributes()
-        if not isinstance(set_attr, Set):
-            return TypeError('attributes must be type Set')
-        elif set_attr - rel_attr != Set():
-            return ValueError('attributes must be a subset of relation')
-        for key in self.keys().elements():
-            if set_attr.subset(key):
-                if set_attr == key:
-                    return False
-                if reason:
-                    set_attr = get_list_string(set_attr.elements())
-                    key = get_list_string(key.elements())
-                    return (set_attr, key)
-                return True
-        return False
+        error = self._check_attributes(set_attr)
+        if error is not None:
+            return error
+        key = self._key_superset(self._universe.encode(set_attr.elements()))
+        if key is None:
+            return False
+        if reason:
+            set_attr = get_list_string(set_attr.elements())
+            key = get_list_string(self._universe.decode_set(key).elements())
+            return (set_attr, key)
+        return True
+
+    def _key_superset(self, set_mask, token=None):
+        """Returns the first candidate key of which the given attributes
+        are a proper subset, or None if there is none.
+
+        Parameters:
+            set_mask(int): A mask of attributes in the relation.
+            token(CancelToken): the cancellation token. None by default.
+
+        Returns:
+            (int): The mask of the candidate key
+        """
+        if set_mask & ~self._prime_mask(token):
+            # Contains an attribute which is in no key
+            return None
+        for key in self._key_masks(token):
+            if set_mask & key == set_mask:
+                if set_mask == key:
+                    # Keys cannot contain one another
+                    return None
+                return key
+        return None
 
     def two_NF(self, reason=None):
         """Return True iff relation is in 2NF. If reason != True,
@@ -489,15 +2174,12 @@ class Rel(object):
             proper subset of a candidate key, or its RHS is a prime
             attribute.
         """
-        for index, FD_LHS in enumerate(self.FD_LHS()):
-            FD_RHS = self.FD_RHS()[index]
-            if self.key_subset(FD_LHS):
-                for attr in FD_RHS.elements():
-                    if not self.prime_attr(attr):
-                        if reason:
-                            return (index, *self.key_subset(FD_LHS, True), attr)
-                        return False
-        return True
+        violation = self.normal_form_report().get_violation('2NF')
+        if violation is None:
+            return True
+        if reason:
+            return violation
+        return False
 
     def two_NF_reason(self):
         """ Prints the first violation instance of 2NF.
@@ -521,16 +2203,12 @@ class Rel(object):
             A given FD in the relation is in 3NF iff the LHS is a
             superkey, or its RHS is a prime attribute.
         """
-        for index, FD_LHS in enumerate(self.FD_LHS()):
-            FD_RHS = self.FD_RHS()[index]
-            if not self.super_key(FD_LHS):
-                for attr in FD_RHS.elements():
-                    if not self.prime_attr(attr):
-                        if reason:
-                            FD_LHS = get_list_string(FD_LHS.elements())
-                            return (index, FD_LHS, attr)
-                        return False
-        return True
+        violation = self.normal_form_report().get_violation('3NF')
+        if violation is None:
+            return True
+        if reason:
+            return violation
+        return False
 
     def three_NF_reason(self):
         """ Prints the first violation instance of 3NF.
@@ -554,13 +2232,35 @@ class Rel(object):
             A given FD in the relation is in BCNF iff the LHS is a
             superkey.
         """
-        for index, FD in enumerate(self.FD_LHS()):
-            if not self.super_key(FD):
-                if reason:
-                    FD = get_list_string(FD.elements())
-                    return (index, FD)
-                return False
-        return True
+        index = self._BCNF_index()
+        if index is None:
+            return True
+        if reason:
+            return (index, get_list_string(self.FD_LHS()[index].elements()))
+        return False
+
+    def _BCNF_index(self, token=None):
+        """Returns the index of the first FD whose LHS is not a
+        superkey, computed once per version. Unlike the normal form
+        report, candidate keys are never enumerated.
+
+        Parameters:
+            token(CancelToken): the cancellation token. None by default.
+
+        Returns:
+            (int): the index of the FD, or None if self is in BCNF
+        """
+        def compute():
+            rel_mask = self._universe.full()
+            FD_LHS = self._FD_table.LHS_masks()
+            for index, LHS_mask in enumerate(FD_LHS):
+                if token is not None and token.check('BCNF', index,
+                                                     len(FD_LHS)):
+                    raise RelTimeout('BCNF')
+                if self._closure_mask(LHS_mask) != rel_mask:
+                    return index
+            return None
+        return self._cached('BCNF', compute)
 
     def BCNF_reason(self):
         """ Prints the first violation instance of BCNF.
@@ -582,15 +2282,123 @@ class Rel(object):
             The relation is always at least in 1NF; i.e, no attributes
             are multi-valued or nested.
         """
-        if not self.two_NF():
-            return '1NF'
-        elif not self.three_NF():
-            return '2NF'
-        elif not self.BCNF():
-            return '3NF'
-        return 'BCNF'
+        return self.normal_form_report().get_normal_form()
+
+    def normal_form_report(self, token=None):
+        """Return a report of the highest normal form of the relation
+        and the first violation of each normal form above 1NF. The
+        report is computed once per version of the relation.
+
+        Parameters:
+            token(CancelToken): raises RelTimeout once expired. None by
+            default.
+
+        Returns:
+            (NormalFormReport): the normal form report
+        """
+        def compute():
+            return self._persistent(
+                'report', True, lambda: self._analyse_normal_form(token),
+                NormalFormReport.to_dict, NormalFormReport.from_dict
+            )
+        return self._cached('report', compute)
+
+    def _analyse_normal_form(self, token=None):
+        """Computes the normal form report from the first violation of
+        each normal form, stopping at the first violation of 2NF since
+        every earlier violation of 3NF and BCNF has been seen by then.
+
+        Parameters:
+            token(CancelToken): the cancellation token. None by default.
+
+        Returns:
+            (NormalFormReport): the normal form report
+        """
+        violations = dict.fromkeys(NORMAL_FORMS[1:])
+        for normal_form, violation in self.iter_violations(token):
+            if violations[normal_form] is None:
+                violations[normal_form] = violation
+            if normal_form == '2NF':
+                return NormalFormReport('1NF', violations)
+        if violations['3NF'] is not None:
+            return NormalFormReport('2NF', violations)
+        elif violations['BCNF'] is not None:
+            return NormalFormReport('3NF', violations)
+        return NormalFormReport('BCNF', violations)
+
+    def all_violations(self, token=None):
+        """Return every violation of 2NF, 3NF and BCNF in the relation,
+        found in a single sweep over the FD's.
+
+        Parameters:
+            token(CancelToken): raises RelTimeout once expired. None by
+            default.
+
+        Returns:
+            (dict<str, list<tuple>>): the violations of each normal form
+            in FD order, in the format returned by two_NF, three_NF and
+            BCNF with reason = True
+        """
+        violations = {}
+        for normal_form in NORMAL_FORMS[1:]:
+            violations[normal_form] = []
+        for normal_form, violation in self.iter_violations(token):
+            violations[normal_form].append(violation)
+        return violations
+
+    def iter_violations(self, token=None):
+        """Generate every violation of 2NF, 3NF and BCNF in the relation
+        in a single sweep over the FD's, sharing the prime attributes,
+        keys and closure of each LHS between the three tests. The
+        relation should not be modified until the generator is
+        exhausted or discarded.
+
+        Parameters:
+            token(CancelToken): raises RelTimeout once expired. None by
+            default.
+
+        Yields:
+            (tuple<str, tuple>): the normal form violated, and the
+            violation in the format returned by two_NF, three_NF or
+            BCNF with reason = True. Violations of the same FD are
+            yielded in the order BCNF, 3NF, 2NF.
+        """
+        prime = self._prime_mask(token)
+        rel_mask = self._universe.full()
+        FD_RHS = self._FD_table.RHS_masks()
+        for index, FD_LHS in enumerate(self._FD_table.LHS_masks()):
+            if self._closure_mask(FD_LHS) == rel_mask:
+                # LHS is a superkey
+                continue
+            LHS_string = get_list_string(self.FD_LHS()[index].elements())
+            yield ('BCNF', (index, LHS_string))
+            if not FD_RHS[index] & ~prime:
+                # RHS is prime
+                continue
+            for attr in self.FD_RHS()[index].elements():
+                if not self._universe.encode([attr]) & prime:
+                    # First non-prime attribute
+                    break
+            yield ('3NF', (index, LHS_string, attr))
+            key = self._key_superset(FD_LHS, token)
+            if key is not None:
+                key = get_list_string(self._universe.decode_set(key).elements())
+                yield ('2NF', (index, LHS_string, key, attr))
+
+    def three_NF_decomp(self, token=None):
+        """Decomposes the relation into 3NF iff its highest normal form
+        is 2NF or lower.
+
+        Parameters:
+            token(CancelToken): raises RelTimeout carrying the list of
+            relations decomposed so far once expired. None by default.
+
+        Returns:
+            (str): the text of the 3NF decomposition
+        """
+        return self.three_NF_decomposition(token).get_text()
 
-    def three_NF_decomp(self):
+    def three_NF_decomposition(self, token=None):
         """Decomposes the relation into 3NF iff its highest normal form
         is 2NF or lower.
 
@@ -598,21 +2406,53 @@ class Rel(object):
             computes minimal cover and then generates
             relations for each FD, eliminating redundancies.
             Adds additional relation for key(s) if not referenced.
+
+        Parameters:
+            token(CancelToken): raises RelTimeout carrying the list of
+            relations decomposed so far once expired. None by default.
+
+        Returns:
+            (Decomposition): the 3NF decomposition
+        """
+        return self._persistent(
+            'three_NF_decomposition', True,
+            lambda: self._three_NF_decomposition(token),
+            Decomposition.to_dict, Decomposition.from_dict
+        )
+
+    def _three_NF_decomposition(self, token=None):
+        """Computes the 3NF decomposition for three_NF_decomposition."""
+        R_decomp_min = []
+        try:
+            return self._three_NF_decomp_relations(R_decomp_min, token)
+        except RelTimeout as timeout:
+            raise RelTimeout('three_NF_decomp', R_decomp_min) from timeout
+
+    def _three_NF_decomp_relations(self, R_decomp_min, token=None):
+        """Computes the 3NF decomposition for _three_NF_decomposition,
+        appending each relation to R_decomp_min as it is decomposed.
+
+        Parameters:
+            R_decomp_min(list<Rel>): an empty list
+            token(CancelToken): the cancellation token. None by default.
+
+        Returns:
+            (Decomposition): the 3NF decomposition
         """
         # Check to see whether self is in 3NF
-        if self.three_NF():
-            return 'Relation is already in 3NF.'
+        if self.normal_form_report(token).get_violation('3NF') is None:
+            return Decomposition('3NF', [])
         # Compute minimal cover with union
-        R_copy = self.min_cover(True)
+        R_copy = self.min_cover(True, token)
         R_decomp = []
         R_empty = Rel()
         # Create a relation for each FD in min cover
-        for index, FD_LHS in enumerate(R_copy.FD_LHS(), 1):
+        for index, FD_LHS in enumerate(R_copy.FD_LHS()):
             R_empty_copy = R_empty.copy()
-            R_empty_copy.add_attributes(R_copy.get_FD(index))
-            R_empty_copy.copy_FD(R_copy, index)
+            R_empty_copy.add_attributes(FD_LHS.union(R_copy.FD_RHS()[index]))
+            R_empty_copy._copy_FD_index(R_copy, index)
             R_decomp.append(R_empty_copy)
-        R_decomp_min = R_decomp.copy()
+        R_decomp_min.extend(R_decomp)
         R_indexed = []
         # Remove redundant relations
         for rel_1 in R_decomp:
@@ -623,29 +2463,42 @@ class Rel(object):
                     if rel_2 != rel_1:
                         if rel_2.attributes().subset(rel_1_attr):
                             R_indexed.append(rel_2)
+                            if rel_2 not in R_decomp_min:
+                                # Already merged into another relation
+                                continue
+                            # Merge rel_2, with any relations it holds
                             R_decomp_index = R_decomp_min.index(rel_1)
-                            R_decomp_min[R_decomp_index].copy_FD(rel_2, 1)
+                            for index in range(rel_2.num_FD()):
+                                R_decomp_min[R_decomp_index]._copy_FD_index(
+                                    rel_2, index
+                                )
                             R_decomp_min.remove(rel_2)
         # Add relation for keys (if applicable)
-        three_NF_string = ''
-        for key in self.keys().elements():
+        K = self.keys(token).elements()
+        for key in K:
             for rel in R_decomp_min:
                 if key.subset(rel.attributes()):
-                    for index, rel in enumerate(R_decomp_min, 1):
-                        if index != 1:
-                            three_NF_string += '\n'
-                        three_NF_string += f'Relation {index} : {rel}\n'
-                    return three_NF_string
-        R_decomp_min.append(Rel(*self.keys().elements()[0].elements()))
-        for index, rel in enumerate(R_decomp_min, 1):
-            if index != 1:
-                three_NF_string += '\n'
-            three_NF_string += f'Relation {index} : {rel}\n'
-        return three_NF_string
+                    return Decomposition('3NF', R_decomp_min)
+        R_key = Rel(*K[0].elements())
+        R_decomp_min.append(R_key)
+        return Decomposition('3NF', R_decomp_min, key_relation=R_key)
+
+    def BCNF_decomp(self, fast=None, token=None):
+        """Decomposes the relation into BCNF iff its highest normal form
+        is 3NF or lower. If fast = True, use the polynomial-time
+        decomposition instead. If token expires, raises RelTimeout
+        carrying the list of relations in BCNF found so far.
 
-    def BCNF_decomp(self):
+        Returns:
+            (str): the text of the BCNF decomposition
+        """
+        return self.BCNF_decomposition(fast, token).get_text()
+
+    def BCNF_decomposition(self, fast=None, token=None):
         """Decomposes the relation into BCNF iff its highest normal form
-        is 3NF or lower.
+        is 3NF or lower. If fast = True, use the polynomial-time
+        decomposition instead. If token expires, raises RelTimeout
+        carrying the list of relations in BCNF found so far.
 
         BCNF decomposition:
             iterates through each FD in relation R from top to bottom
@@ -655,67 +2508,164 @@ class Rel(object):
             If any other non-trivial FD's from R hold on R2 which are
             not in BCNF, then R2 is decomposed again as above.
             Repeat until all relations are in BCNF.
+
+        Fast BCNF decomposition:
+            uses the algorithm of Tsou and Fischer, which never computes
+            the FD's holding on each relation. Attributes are removed
+            from the remaining relation Z until no two attributes A and
+            B are left with A in the closure of the rest. What is left
+            is then a relation XA in BCNF with X -> A, and A is removed
+            from Z. Repeat until no such A and B exist in Z.
+            Only the FD X -> A is listed for each relation.
+
+        Returns:
+            (Decomposition): the BCNF decomposition
         """
-        # Check to see whether self is in BCNF
-        if self.BCNF():
-            return 'Relation is already in BCNF.'
-        R_temp = []
+        name = 'BCNF_decomposition_fast' if fast else 'BCNF_decomposition'
+        return self._persistent(
+            name, True, lambda: self._BCNF_decomposition(fast, token),
+            Decomposition.to_dict, Decomposition.from_dict
+        )
+
+    def _BCNF_decomposition(self, fast=None, token=None):
+        """Computes the BCNF decomposition for BCNF_decomposition."""
         R_BCNF = []
-        R_not_BCNF = []
-        # Decompose into BCNF using top-down approach
-        for FD_LHS in self.FD_LHS():
-            if not self.super_key(FD_LHS):
-                rel_1 = self.infer_FD(self.closure(FD_LHS))
-                rel_2_attr = self.attributes() - rel_1.attributes()
-                rel_2 = self.infer_FD(rel_2_attr.union(FD_LHS))
-                break
-        R_temp.extend([rel_1, rel_2])
-        for rel in R_temp:
-            if rel.BCNF():
-                R_BCNF.append(rel)
+        try:
+            # Check to see whether self is in BCNF, without enumerating
+            # keys so that the fast decomposition stays polynomial
+            if self._BCNF_index(token) is None:
+                return Decomposition('BCNF', [])
+            if fast:
+                self._BCNF_decomp_fast(R_BCNF, token)
             else:
-                R_not_BCNF.append(rel)
-        R_temp = []
-        for rel in R_not_BCNF:
-            for FD_LHS in rel.FD_LHS():
-                if not rel.super_key(FD_LHS):
-                    rel_1 = rel.infer_FD(rel.closure(FD_LHS))
-                    rel_2_attr = rel.attributes() - rel_1.attributes()
-                    rel_2 = rel.infer_FD(rel_2_attr.union(FD_LHS))
-                    break
-            R_temp.extend([rel_1, rel_2])
-            for rel in R_temp:
-                if rel.BCNF():
-                    R_BCNF.append(rel)
+                self._BCNF_decomp_exact(R_BCNF, token)
+            R_min = self.min_cover(True, token)
+        except RelTimeout as timeout:
+            raise RelTimeout('BCNF_decomp', R_BCNF) from timeout
+        # Find attributes no longer determined by each FD
+        FD_lost = []
+        rel_masks = []
+        for rel in R_BCNF:
+            rel_masks.append(self._universe.encode(rel.attributes_list()))
+        for index, FD_LHS in enumerate(R_min._FD_table.LHS_masks()):
+            attr_lost = self._closure_mask(FD_LHS) \
+                & ~self._preserved_closure(FD_LHS, rel_masks)
+            if attr_lost:
+                FD_lost.append((R_min.FD_LHS()[index],
+                                self._universe.decode_set(attr_lost)))
+        return Decomposition('BCNF', R_BCNF, FD_lost, complete=not fast)
+
+    def _BCNF_decomp_exact(self, R_BCNF, token=None):
+        """Appends the relations of the BCNF decomposition to R_BCNF,
+        each with the minimal cover with union of the FD's holding on
+        it once the decomposition is complete.
+
+        Parameters:
+            R_BCNF(list<Rel>): an empty list
+            token(CancelToken): the cancellation token. None by default.
+        """
+        R_not_BCNF = deque([self])
+        # Decompose into BCNF using top-down approach
+        while R_not_BCNF:
+            if token is not None and token.check(
+                    'BCNF_decomp', len(R_BCNF),
+                    len(R_BCNF) + len(R_not_BCNF) + 1):
+                raise RelTimeout('BCNF_decomp', R_BCNF)
+            rel = R_not_BCNF.popleft()
+            index = rel._BCNF_index(token)
+            FD_LHS = rel._FD_table.LHS_masks()[index]
+            rel_1_attr = rel._closure_mask(FD_LHS)
+            rel_1 = rel._infer_FD_mask(rel_1_attr, token)
+            rel_2_attr = rel._universe.full() & ~rel_1_attr
+            rel_2 = rel._infer_FD_mask(rel_2_attr | FD_LHS, token)
+            for rel_new in [rel_1, rel_2]:
+                if rel_new._BCNF_index(token) is None:
+                    R_BCNF.append(rel_new)
                 else:
-                    R_not_BCNF.append(rel)
-            R_temp = []
+                    R_not_BCNF.append(rel_new)
         for i, rel in enumerate(R_BCNF):
-            R_BCNF.pop(i)
-            R_BCNF.insert(i, rel.min_cover(True))
-        R_join = self.copy()
-        R_join.reset_FD()
-        for rel in R_BCNF:
-            num_FDs = len(rel.FD_LHS())
-            for i in range(1, num_FDs + 1):
-                R_join.copy_FD(rel, i)
-        BCNF_string = ''
-        for index, rel in enumerate(R_BCNF, 1):
-            if index != 1:
-                BCNF_string += '\n'
-            BCNF_string += f'Relation {index} : {rel}\n'
-        BCNF_string += '\nFunctional Dependencies lost: \n'
-        num_FD_lost = 0
-        R_min = self.min_cover(True)
-        for FD_LHS in R_min.FD_LHS():
-            attr_lost = R_min.closure(FD_LHS) - R_join.closure(FD_LHS)
-            if attr_lost != Set():
-                num_FD_lost += 1
-                FD_string = get_FD_string(FD_LHS.elements(), attr_lost.elements())
-                BCNF_string += f'{num_FD_lost}. {FD_string}\n'
-        if num_FD_lost == 0:
-            BCNF_string += 'None\n'
-        return BCNF_string
+            R_BCNF[i] = rel.min_cover(True, token)
+
+    def _BCNF_decomp_fast(self, R_BCNF, token=None):
+        """Appends the relations of the BCNF decomposition found by the
+        algorithm of Tsou and Fischer to R_BCNF, each with the FD used
+        to form it.
+
+        Parameters:
+            R_BCNF(list<Rel>): an empty list
+            token(CancelToken): the cancellation token. None by default.
+        """
+        decode = self._universe.decode
+        remaining = self._universe.full()
+        pair = self._BCNF_pair(remaining)
+        while pair is not None:
+            # Shrink the remaining relation until it is in BCNF
+            set_mask = remaining
+            while pair is not None:
+                # Each relation removes an attribute from the rest
+                if token is not None and token.check(
+                        'BCNF_decomp', len(R_BCNF), self._universe.card()):
+                    raise RelTimeout('BCNF_decomp', R_BCNF)
+                attr, other = pair
+                set_mask &= ~other
+                pair = self._BCNF_pair(set_mask)
+            rel = Rel(*decode(set_mask))
+            encode = rel._universe.encode
+            rel._add_FD_mask(encode(decode(set_mask & ~attr)),
+                             encode(decode(attr)))
+            R_BCNF.append(rel)
+            remaining &= ~attr
+            pair = self._BCNF_pair(remaining)
+        R_BCNF.append(Rel(*decode(remaining)))
+
+    def _BCNF_pair(self, set_mask):
+        """Returns attributes A and B in the given attributes such that
+        A is in the closure of the others. If there are none, the
+        relation on the given attributes is in BCNF.
+
+        Parameters:
+            set_mask(int): A mask of attributes in the relation.
+
+        Returns:
+            (tuple<int, int>): the masks of A and B, or None
+        """
+        bits = []
+        rest = set_mask
+        while rest:
+            low = rest & -rest
+            rest ^= low
+            bits.append(low)
+        for attr in bits:
+            rest = set_mask & ~attr
+            if not self._closure_mask(rest) & attr:
+                # Not in the closure of any subset of the others
+                continue
+            for other in bits:
+                if other != attr and self._closure_mask(rest & ~other) & attr:
+                    return (attr, other)
+        return None
+
+    def _preserved_closure(self, set_mask, rel_masks):
+        """Find the closure of a mask of attributes under the FD's which
+        hold on each of the given relations, without computing them.
+
+        Parameters:
+            set_mask(int): A mask of attributes in the relation.
+            rel_masks(list<int>): the masks of the relations.
+
+        Returns:
+            (int): The mask of the closure of the attributes.
+        """
+        close_mask = set_mask
+        changed = True
+        while changed:
+            changed = False
+            for rel_mask in rel_masks:
+                new_mask = self._closure_mask(close_mask & rel_mask) & rel_mask
+                if new_mask & ~close_mask:
+                    close_mask |= new_mask
+                    changed = True
+        return close_mask
 
     def __repr__(self):
         """The human-readable representation of the relation and its
@@ -1,8 +1,11 @@
 from relation_GUI_constants import *
+import threading
 import tkinter as tk
 from tkinter import messagebox
 from idlelib.tooltip import Hovertip
+from relation import CancelToken
 from relation import Rel
+from relation import RelTimeout
 from relation import get_FD_string
 from relation import get_list_string
 from set_theory import Set
@@ -51,6 +54,119 @@ def set_cell_weights(frame, num_rows, num_cols):
         frame.columnconfigure(col, weight=DEFAULT_WEIGHT)
 
 
+class BackgroundTask(object):
+    """ A class representing a calculation which runs on a worker thread,
+    so that the application stays responsive. The window polls for the
+    result using after(), and passes it on from the main thread.
+    Cancelling the task expires its cancellation token, so that the
+    calculation stops early, and the progress reported to the token is
+    shown in the window on each poll."""
+
+    def __init__(self, relative, compute, on_done, on_error,
+                 on_progress=None):
+        """ Creates a new BackgroundTask instance and starts the
+        calculation on a worker thread.
+
+        Parameters:
+            relative(ChildWindow): the window awaiting the result
+            compute: a function of a cancellation token which returns
+                the result. Must not use tkinter.
+            on_done: a function called with the result once done
+            on_error: a function called with the exception if the
+                calculation fails
+            on_progress: a function of no arguments called on each
+                poll while running. None by default.
+        """
+        self._relative = relative
+        self._compute = compute
+        self._on_done = on_done
+        self._on_error = on_error
+        self._on_progress = on_progress
+        self._result = None
+        self._error = None
+        self._cancelled = False
+        self._progress = None
+        self._progress_shown = None
+        self._token = CancelToken(
+            progress=self.set_progress,
+            interval=TASK_POLL_DELAY / 1000
+        )
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        # Poll from the event loop, so that the window holds the task
+        # before any callback runs
+        relative.get_window().after(0, self.poll)
+
+    def run(self):
+        """ Computes the result on the worker thread."""
+        try:
+            self._result = self._compute(self._token)
+        except RelTimeout as error:
+            if not self._token.expired():
+                # Raised by a token other than the task's own
+                self._error = error
+        except Exception as error:
+            self._error = error
+        self._done.set()
+
+    def set_progress(self, phase, processed, total):
+        """ Records the progress of the calculation on the worker
+        thread, for the next poll to show.
+
+        Parameters:
+            phase(str): the name of the algorithm running
+            processed(int): the number of items processed so far
+            total(int): the estimated total number of items
+        """
+        self._progress = (phase, processed, total)
+
+    def poll(self):
+        """ Passes on the result if the calculation is done, and polls
+        again later otherwise. Stops once cancelled or once the window
+        is closed."""
+        if self._cancelled:
+            return
+        window = self._relative.get_window()
+        try:
+            if not window.winfo_exists():
+                # Window closed, so nothing awaits the result
+                self.cancel()
+                return
+            if not self._done.is_set():
+                progress = self._progress
+                if progress is not None and progress != self._progress_shown:
+                    self._progress_shown = progress
+                    self._relative.show_progress(*progress)
+                if self._on_progress is not None:
+                    self._on_progress()
+                window.after(TASK_POLL_DELAY, self.poll)
+                return
+        except tk.TclError:
+            # Application closed
+            self.cancel()
+            return
+        if self._error is not None:
+            self._on_error(self._error)
+            return
+        self._on_done(self._result)
+
+    def cancel(self):
+        """ Stops the calculation and waiting for the result, which is
+        discarded."""
+        self._cancelled = True
+        self._token.cancel()
+
+    def is_running(self):
+        """ Determines whether the calculation is still running
+
+        Returns:
+            (bool): True iff the calculation has not finished and
+            has not been cancelled. False otherwise.
+        """
+        return not self._cancelled and not self._done.is_set()
+
+
 class WindowMenu(object):
     """ A class representing the menu of the main window"""
 
@@ -224,6 +340,11 @@ class MainWindow(object):
         self._main_frame = initialise_grid(self._main_window)
         # Initialise relation variable
         self._relation = None
+        # Initialise results cached for the current version of relation
+        self._snapshot = None
+        self._snapshot_version = None
+        self._snapshot_lock = threading.Lock()
+        self._results = {}
         # Add menubar
         WindowMenu(self)
         # Create loop
@@ -271,6 +392,64 @@ class MainWindow(object):
             attributes(list<str>): the list of attributes
         """
         self._relation = Rel(*attributes)
+        self.clear_results()
+
+    def get_snapshot(self):
+        """ Returns a copy of the relation which is shared by every
+        calculation on the current version of the relation, so that
+        results found along the way, such as the candidate keys, are
+        reused between windows. Calculations must hold the snapshot
+        lock while using the snapshot.
+
+        Returns:
+            (Rel): the snapshot of the relation
+        """
+        if self._snapshot is None \
+                or self._snapshot_version != self._relation.version():
+            self.clear_results()
+            self._snapshot = self._relation.copy()
+            self._snapshot_version = self._relation.version()
+        return self._snapshot
+
+    def get_snapshot_lock(self):
+        """ Returns the lock held by calculations using the snapshot
+
+        Returns:
+            (Lock): the snapshot lock
+        """
+        return self._snapshot_lock
+
+    def get_result(self, name):
+        """ Returns a result cached for the current version of the
+        relation
+
+        Parameters:
+            name(str): the name of the result
+
+        Returns:
+            the result, or None if it is not cached
+        """
+        self.get_snapshot()
+        return self._results.get(name)
+
+    def set_result(self, name, snapshot, result):
+        """ Caches a result, unless the relation has been modified
+        since the calculation started.
+
+        Parameters:
+            name(str): the name of the result
+            snapshot(Rel): the snapshot used by the calculation
+            result: the result
+        """
+        if snapshot is self._snapshot:
+            self._results[name] = result
+
+    def clear_results(self):
+        """ Discards the snapshot and every cached result. Must be
+        called whenever the relation is modified."""
+        self._snapshot = None
+        self._snapshot_version = None
+        self._results = {}
 
     def get_width(self, scale):
         """ Returns the width of a widget relative to the
@@ -356,6 +535,116 @@ class ChildWindow(object):
         self._child_window.update_idletasks()
         # Configure grid
         self._child_frame = initialise_grid(self._child_window)
+        # No calculation running yet
+        self._task = None
+
+    def run_task(self, compute, on_done, on_progress=None):
+        """ Runs a calculation on a worker thread, cancelling any
+        calculation already running in the window.
+
+        Parameters:
+            compute: a function of a cancellation token which returns
+                the result. Must not use tkinter.
+            on_done: a function called with the result once done
+            on_progress: a function of no arguments called periodically
+                while running. None by default.
+        """
+        self.cancel_task()
+        self.set_running(True)
+
+        def finish(result):
+            self._task = None
+            self.set_running(False)
+            on_done(result)
+
+        def fail(error):
+            self._task = None
+            self.set_running(False)
+            self.task_failed(error)
+        self._task = BackgroundTask(self, compute, finish, fail, on_progress)
+
+    def run_result_task(self, name, compute, on_done, on_progress=None):
+        """ Runs a calculation on the snapshot of the relation as in
+        run_task, unless its result is cached in the main window for the
+        current version of the relation. The result is cached once done.
+
+        Parameters:
+            name(str): the name of the result
+            compute: a function of the snapshot and a cancellation token
+                which returns the result. Must not use tkinter.
+            on_done: a function called with the result once done
+            on_progress: a function of no arguments called periodically
+                while running. None by default.
+        """
+        parent = self.get_parent()
+        result = parent.get_result(name)
+        if result is not None:
+            self.cancel_task()
+            on_done(result)
+            return
+        snapshot = parent.get_snapshot()
+        lock = parent.get_snapshot_lock()
+
+        def compute_locked(token):
+            with lock:
+                return compute(snapshot, token)
+
+        def finish(result):
+            parent.set_result(name, snapshot, result)
+            on_done(result)
+        self.run_task(compute_locked, finish, on_progress)
+
+    def cancel_task(self):
+        """ Cancels the calculation running in the window, if any.
+
+        Returns:
+            (bool): True iff a calculation was cancelled.
+            False otherwise.
+        """
+        if self._task is None or not self._task.is_running():
+            return False
+        self._task.cancel()
+        self._task = None
+        self.set_running(False)
+        return True
+
+    def set_running(self, running):
+        """ Represents an abstract function which is called whenever a
+        calculation starts or stops running in the window.
+
+        Parameters:
+            running(bool): True iff a calculation is running
+        """
+        return
+
+    def task_cancelled(self):
+        """ Represents an abstract function which is called whenever
+        the user cancels the calculation running in the window."""
+        return
+
+    def task_failed(self, error):
+        """ Shows the error raised by the calculation running in the
+        window. By default, in a message box.
+
+        Parameters:
+            error(Exception): the error raised
+        """
+        messagebox.showinfo(
+            'Error',
+            f'The calculation failed: {error}',
+            parent=self.get_window()
+        )
+
+    def show_progress(self, phase, processed, total):
+        """ Represents an abstract function which is called whenever
+        the calculation running in the window reports new progress.
+
+        Parameters:
+            phase(str): the name of the algorithm running
+            processed(int): the number of items processed so far
+            total(int): the estimated total number of items
+        """
+        return
 
     def get_parent(self):
         """ Returns the main window instance
@@ -652,8 +941,8 @@ class NormalFormWindow(ChildWindow):
             parent(MainWindow): the main window
         """
         super().__init__(parent)
-        # Get relation from parent
-        relation = self.get_parent().get_relation()
+        # Normal form report is found on a worker thread
+        self._report = None
         # Create title
         TitleText(
             self,
@@ -663,7 +952,7 @@ class NormalFormWindow(ChildWindow):
             DEFAULT_COL_SPAN
         )
         # Create normal form text
-        text_one = ScrolledHVText(
+        self._text_one = ScrolledHVText(
             self,
             True,
             False,
@@ -671,8 +960,6 @@ class NormalFormWindow(ChildWindow):
             LEFT_TEXT_COL,
             DEFAULT_COL_SPAN
         )
-        # Set normal form text
-        text_one.set_text(f' {relation.highest_NF()}')
         # Create label
         LabelText(
             self,
@@ -682,7 +969,7 @@ class NormalFormWindow(ChildWindow):
             DEFAULT_COL_SPAN
         )
         # Create reason text
-        text_two = ScrolledHVText(
+        self._text_two = ScrolledHVText(
             self,
             True,
             True,
@@ -690,20 +977,79 @@ class NormalFormWindow(ChildWindow):
             LEFT_TEXT_COL,
             DEFAULT_COL_SPAN
         )
-        # Set reason text
-        text_two.set_text(self.get_reason())
         # Create okay button
         OkayButton(
             self,
             BUTTON_TWO_ROW,
             SUBMIT_BUTTON_COL
         )
+        # Create cancel button, shown while calculating
+        self._cancel_button = TaskCancelButton(
+            self,
+            BUTTON_TWO_ROW,
+            CANCEL_BUTTON_COL
+        )
         # Set cell weights
         set_cell_weights(
             self._child_frame,
             EXTENSIVE_NUM_ROWS,
             DEFAULT_NUM_COLS
         )
+        # Find normal form report of the snapshot of the relation
+        self.run_result_task(
+            'report',
+            lambda relation, token: relation.normal_form_report(token),
+            self.set_report
+        )
+
+    def set_report(self, report):
+        """ Sets the normal form and reason text from the given
+        normal form report.
+
+        Parameters:
+            report(NormalFormReport): the normal form report
+        """
+        self._report = report
+        self._text_one.set_text(f' {self._report.get_normal_form()}')
+        self._text_two.set_text(self.get_reason())
+
+    def set_running(self, running):
+        """ Shows the cancel button and running text while the
+        normal form is being found.
+
+        Parameters:
+            running(bool): True iff a calculation is running
+        """
+        if running:
+            self._text_one.set_text(' Calculating...')
+            self._cancel_button.show()
+        else:
+            self._cancel_button.hide()
+
+    def task_cancelled(self):
+        """ Sets the normal form text once cancelled."""
+        self._text_one.set_text(' Calculation cancelled')
+
+    def task_failed(self, error):
+        """ Sets the normal form text once the calculation fails.
+
+        Parameters:
+            error(Exception): the error raised
+        """
+        self._text_one.set_text(f' Calculation failed: {error}')
+
+    def show_progress(self, phase, processed, total):
+        """ Sets the running text to show the progress of the
+        calculation.
+
+        Parameters:
+            phase(str): the name of the algorithm running
+            processed(int): the number of items processed so far
+            total(int): the estimated total number of items
+        """
+        self._text_one.set_text(
+            f' Calculating... ({phase}: {processed} of ~{total})'
+        )
 
     def get_reason(self):
         """ Returns a string detailing which dependency resulted
@@ -715,11 +1061,10 @@ class NormalFormWindow(ChildWindow):
             (str): the string detailing the problem dependency (if any)
             and the reason(s) for the violation.
         """
-        # Get relation from parent
         parent = self.get_parent()
-        relation = parent.get_relation()
-        # Find highest normal form
-        normal_form = relation.highest_NF()
+        # Find highest normal form and first violation of the next
+        normal_form = self._report.get_normal_form()
+        violation = self._report.get_violation()
         # Get widget which holds dependencies
         for widget in parent.get_widgets():
             if isinstance(widget, tk.Listbox):
@@ -727,17 +1072,17 @@ class NormalFormWindow(ChildWindow):
                 break
         if normal_form == '1NF':
             # Highest normal form is 1NF
-            index, subset, key, attribute = relation.two_NF(True)
+            index, subset, key, attribute = violation
             reason = f' {BULLET} {subset} is a proper subset of key {key}\n' \
                      f' {BULLET} {attribute} is not a prime attribute'
         elif normal_form == '2NF':
             # Highest normal form is 2NF
-            index, subset, attribute = relation.three_NF(True)
+            index, subset, attribute = violation
             reason = f' {BULLET} {subset} is not a superkey\n' \
                      f' {BULLET} {attribute} is not a prime attribute'
         elif normal_form == '3NF':
             # Highest normal form is 3NF
-            index, subset = relation.BCNF(True)
+            index, subset = violation
             reason = f' {BULLET} {subset} is not a superkey'
         else:
             # Highest normal form is BCNF
@@ -783,6 +1128,12 @@ class OutputWindow(ChildWindow):
             BUTTON_ROW,
             SUBMIT_BUTTON_COL
         )
+        # Create cancel button, shown while calculating
+        self._cancel_button = TaskCancelButton(
+            self,
+            BUTTON_ROW,
+            CANCEL_BUTTON_COL
+        )
         # Set cell weights
         set_cell_weights(
             self._child_frame,
@@ -790,6 +1141,44 @@ class OutputWindow(ChildWindow):
             DEFAULT_NUM_COLS
         )
 
+    def set_running(self, running):
+        """ Shows the cancel button and running text while a
+        calculation is running.
+
+        Parameters:
+            running(bool): True iff a calculation is running
+        """
+        if running:
+            self._text.set_text(' Calculating...')
+            self._cancel_button.show()
+        else:
+            self._cancel_button.hide()
+
+    def task_cancelled(self):
+        """ Sets the output text once cancelled."""
+        self._text.set_text(' Calculation cancelled')
+
+    def task_failed(self, error):
+        """ Sets the output text once the calculation fails.
+
+        Parameters:
+            error(Exception): the error raised
+        """
+        self._text.set_text(f' Calculation failed: {error}')
+
+    def show_progress(self, phase, processed, total):
+        """ Sets the running text to show the progress of the
+        calculation.
+
+        Parameters:
+            phase(str): the name of the algorithm running
+            processed(int): the number of items processed so far
+            total(int): the estimated total number of items
+        """
+        self._text.set_text(
+            f' Calculating... ({phase}: {processed} of ~{total})'
+        )
+
 
 class CandidateKeysWindow(OutputWindow):
     """ A class representing a window which outputs any
@@ -806,30 +1195,70 @@ class CandidateKeysWindow(OutputWindow):
         """
         super().__init__(parent, 'Candidate keys')
         # Set scrolled text to contain keys
-        self._text.set_text(self.get_keys())
+        self.set_keys_text()
 
-    def get_keys(self):
-        """ Returns the string of candidate keys for the
-        relation.
+    def set_keys_text(self):
+        """ Finds the candidate keys for the relation on a worker
+        thread, showing each key as soon as it is found."""
+        self._keys = []
+        self._keys_shown = 0
 
-        Returns:
-            (str): the candidate keys for the relation
+        def find_keys(relation, token):
+            for key_set in relation.iter_keys(token):
+                self._keys.append(key_set)
+            return self._keys
+        self.run_result_task('keys', find_keys, self.show_keys, self.show_keys)
+
+    def show_keys(self, keys=None):
+        """ Shows the candidate keys found since the last call, appending
+        them to the text so that the scroll position is kept.
+
+        Parameters:
+            keys(list<Set>): the keys found. None to use the keys
+                found so far by the running calculation.
         """
+        if keys is None:
+            keys = self._keys[:]
+        if len(keys) <= self._keys_shown:
+            # No new keys, so keep the current text
+            return
         keys_string = ''
-        # Get relation from parent
-        relation = self.get_parent().get_relation()
-        # Get candidate keys set
-        keys_set = relation.keys()
-        # Iterate through keys set and add to string
-        for index, key_set in enumerate(keys_set.elements(), 1):
-            if index != 1:
+        # Iterate through new keys and add to string
+        for index in range(self._keys_shown, len(keys)):
+            if index != 0:
                 # Append newline character
                 keys_string += '\n'
             # Append key number to string
-            keys_string += f'{f"{index}. ":>4}'
+            keys_string += f'{f"{index + 1}. ":>4}'
             # Append key to string
-            keys_string += get_list_string(key_set.elements())
-        return keys_string
+            keys_string += get_list_string(keys[index].elements())
+        if self._keys_shown == 0:
+            # Replace running text
+            self._text.set_text(keys_string)
+        else:
+            self._text.append_text(keys_string)
+        self._keys_shown = len(keys)
+
+    def show_progress(self, phase, processed, total):
+        """ Shows the progress of the calculation until a key is found.
+
+        Parameters:
+            phase(str): the name of the algorithm running
+            processed(int): the number of items processed so far
+            total(int): the estimated total number of items
+        """
+        if self._keys_shown == 0:
+            super().show_progress(phase, processed, total)
+
+    def task_cancelled(self):
+        """ Sets the keys found before the calculation was
+        cancelled."""
+        keys = self._keys[:]
+        if not keys:
+            super().task_cancelled()
+            return
+        self.show_keys(keys)
+        self._text.append_text('\n\n Calculation cancelled')
 
 
 class MinimalCoverWindow(OutputWindow):
@@ -864,12 +1293,13 @@ class MinimalCoverWindow(OutputWindow):
             union(bool): an option to use the union
                 of the minimal cover
         """
-        # Get relation from parent
-        relation = self.get_parent().get_relation()
-        # Get minimal cover
-        min_dependencies = relation.min_cover(union).get_dependencies()
-        # Set minimal cover text
-        self._text.set_text(min_dependencies)
+        # Find minimal cover and set minimal cover text
+        self.run_result_task(
+            'min_cover_union' if union else 'min_cover',
+            lambda relation, token:
+                relation.min_cover(union, token).get_dependencies(),
+            self._text.set_text
+        )
 
 
 class ThreeNFWindow(OutputWindow):
@@ -886,19 +1316,26 @@ class ThreeNFWindow(OutputWindow):
         """
         super().__init__(parent, '3NF synthesis')
         # Set 3NF synthesis text
-        self._text.set_text(self.get_three_NF_text())
+        self.run_result_task(
+            'three_NF_decomp',
+            self.get_three_NF_text,
+            self._text.set_text
+        )
 
-    def get_three_NF_text(self):
+    def get_three_NF_text(self, relation, token=None):
         """ Returns a string containing the 3NF synthesis
         of the relation.
-        
+
+        Parameters:
+            relation(Rel): the relation
+            token(CancelToken): the cancellation token of the
+                calculation. None by default.
+
         Returns:
             (str): the 3NF synthesis of the relation
         """
-        # Get relation from parent
-        relation = self.get_parent().get_relation()
         # Get 3NF synthesis
-        three_NF_text = relation.three_NF_decomp()
+        three_NF_text = relation.three_NF_decomp(token)
         return three_NF_text
 
 
@@ -916,20 +1353,29 @@ class BCNFWindow(OutputWindow):
         """
         super().__init__(parent, 'BCNF decomposition')
         # Set BCNF decomposition text
-        self._text.set_text(self.get_BCNF_text())
+        self.set_BCNF_text()
+        # Create fast button
+        FastButton(
+            self,
+            BUTTON_ROW,
+            LEFT_TEXT_COL
+        )
 
-    def get_BCNF_text(self):
-        """ Returns a string containing the BCNF decomposition
-        of the relation.
-        
-        Returns:
-            (str): the BCNF decomposition of the relation
+    def set_BCNF_text(self, fast=None):
+        """ Sets the BCNF decomposition for the relation.
+        If fast == True, then the set text is the
+        polynomial-time BCNF decomposition.
+
+        Parameters:
+            fast(bool): an option to use the polynomial-time
+                decomposition
         """
-        # Get relation from parent
-        relation = self.get_parent().get_relation()
-        # Get BCNF decomposition
-        BCNF_text = relation.BCNF_decomp()
-        return BCNF_text
+        # Find BCNF decomposition and set BCNF decomposition text
+        self.run_result_task(
+            'BCNF_decomp_fast' if fast else 'BCNF_decomp',
+            lambda relation, token: relation.BCNF_decomp(fast, token),
+            self._text.set_text
+        )
 
 
 class OptionWindow(ChildWindow):
@@ -1032,6 +1478,8 @@ class ClosureWindow(OptionWindow):
             parent(MainWindow): the main window
         """
         super().__init__(parent, 'Closure')
+        # Maintain closure as attributes are selected
+        self._session = parent.get_relation().closure_session()
         # Initialise closure label text
         self.set_closure_text()
 
@@ -1049,11 +1497,10 @@ class ClosureWindow(OptionWindow):
     def set_closure_text(self):
         """ Sets the text detailing the closure of the attributes
         currently selected by the user in the listbox."""
-        relation = self.get_parent().get_relation()
         # Get selected attributes and convert to Set
         attributes_subset = Set(*self._list.get_selected_lines())
         # Find closure set
-        closure_set = relation.closure(attributes_subset)
+        closure_set = self._session.update(attributes_subset)
         # Find closure string
         closure_string = get_list_string(closure_set.elements())
         self._text_two.set_text(
@@ -1074,6 +1521,8 @@ class SuperKeyWindow(OptionWindow):
             parent(MainWindow): the main window
         """
         super().__init__(parent, 'Superkey test')
+        # Maintain closure as attributes are selected
+        self._session = parent.get_relation().closure_session()
         # Initialise superkey label text
         self.set_superkey_text()
 
@@ -1092,11 +1541,11 @@ class SuperKeyWindow(OptionWindow):
         """ Sets the text detailing whether the attributes
         currently selected by the user in the listbox forms
         a super key."""
-        relation = self.get_parent().get_relation()
         # Get selected attributes and convert to Set
         attributes_subset = Set(*self._list.get_selected_lines())
         # Determine whether subset forms a superkey
-        is_superkey = relation.super_key(attributes_subset)
+        self._session.update(attributes_subset)
+        is_superkey = self._session.super_key()
         self._text_two.set_text(
             f' Superkey = {is_superkey}'
         )
@@ -1313,6 +1762,20 @@ class ScrolledHVText(WindowComponent):
         # Disable ability to modify text
         self.disable_text()
 
+    def append_text(self, text):
+        """ Appends the specified string to the contents of the widget,
+        keeping the scroll position.
+
+        Parameters:
+            text(str): the text to append to the widget
+        """
+        # Enable ability to modify text
+        self.enable_text()
+        # Insert text at end
+        self._text.insert(tk.END, text)
+        # Disable ability to modify text
+        self.disable_text()
+
     def set_text_colour(self, colour, start, end):
         """ Changes the colour of the text in the widget
         between the specified start and end indexes, inclusive.
@@ -1448,6 +1911,14 @@ class BaseButton(WindowComponent):
         button is pressed."""
         return
 
+    def show(self):
+        """ Shows the button in its place in the grid."""
+        self._button.grid()
+
+    def hide(self):
+        """ Hides the button, keeping its place in the grid."""
+        self._button.grid_remove()
+
 
 class TextButton(BaseButton):
     """ An abstract class representing a type of button which contains text.
@@ -1537,6 +2008,31 @@ class OkayButton(CloseButton):
         self.set_text('Okay')
 
 
+class TaskCancelButton(TextButton):
+    """ A class representing a type of button which cancels the
+    calculation running in the window. Hidden until a calculation
+    starts. Extends TextButton."""
+
+    def __init__(self, relative, row_num, col_num):
+        """ Creates a new TaskCancelButton instance and places it in
+        the window. Sets the text as 'Cancel'.
+
+        Parameters:
+            relative(ChildWindow): the window in which the button resides
+            row_num(int): the row in which the button resides
+            col_num(int): the column in which the button resides
+        """
+        super().__init__(relative, row_num, col_num)
+        # Set text of cancel button
+        self.set_text('Cancel')
+        self.hide()
+
+    def button_action(self):
+        """ Cancels the running calculation, on button interaction."""
+        if self._relative.cancel_task():
+            self._relative.task_cancelled()
+
+
 class SubmitButton(TextButton):
     """ An abstract class representing a type of button which performs
     an action and closes the window. Extends TextButton."""
@@ -1606,8 +2102,7 @@ class CreateDependencyButton(SubmitButton):
         left_attributes = child.get_left_attributes()
         right_attributes = child.get_right_attributes()
         # Check if relation contains dependency in question
-        FD_string = get_FD_string(left_attributes, right_attributes)
-        if relation.contains_FD(FD_string):
+        if relation.has_FD(left_attributes, right_attributes):
             # Relation already contains dependency
             messagebox.showinfo(
                 'Error',
@@ -1625,6 +2120,8 @@ class CreateDependencyButton(SubmitButton):
                 parent=self._relative.get_window()
             )
             return
+        # Discard results found for the relation without dependency
+        parent.clear_results()
         # Add dependency to main window list
         for widget in parent.get_widgets():
             if isinstance(widget, tk.Listbox):
@@ -1638,41 +2135,99 @@ class CreateDependencyButton(SubmitButton):
         self._window.destroy()
 
 
-class UnionButton(TextButton):
-    """ A class representing a type of button which enables or disables
-    union of the displayed minimal cover. Extends TextButton."""
+class ToggleButton(TextButton):
+    """ An abstract class representing a type of button which switches
+    an option on and off. Extends TextButton."""
 
-    def __init__(self, relative, row_num, col_num):
-        """ Creates a new UnionButton instance and places it in
-        the window. Sets the text as 'Union' and configures visuals.
+    def __init__(self, relative, row_num, col_num, label):
+        """ Creates a new ToggleButton instance and places it in
+        the window. Sets the text as the label and configures visuals.
 
         Parameters:
             relative(object): the window in which the button resides
             row_num(int): the row in which the button resides
             col_num(int): the column in which the button resides
+            label(str): the name of the option
         """
         super().__init__(relative, row_num, col_num)
-        # Set text on union button
-        self.set_text(f'Union {OFF}')
+        self._label = label
+        # Set text on toggle button
+        self.set_text(f'{label} {OFF}')
         # Configure button options
         self._button.configure(relief=tk.GROOVE)
         # Configure grid options
         self._button.grid(sticky='nes')
 
     def button_action(self):
-        """ Toggles whether to display the minimal cover with union
-        or no union, on button interaction."""
+        """ Toggles the option on or off, on button interaction."""
         button_text = self._button['text']
-        if button_text == f'Union {OFF}':
+        if button_text == f'{self._label} {OFF}':
             # Put button in ON state
-            self._button.configure(text=f'Union {ON}')
-            # Set min cover text (with union)
-            self._relative.set_min_cover_text(True)
+            self._button.configure(text=f'{self._label} {ON}')
+            self.toggle(True)
         else:
             # Put button in OFF state
-            self._button.configure(text=f'Union {OFF}')
-            # Set min cover text
-            self._relative.set_min_cover_text()
+            self._button.configure(text=f'{self._label} {OFF}')
+            self.toggle(None)
+
+    def toggle(self, option):
+        """ Represents an abstract function which is called whenever the
+        option is switched.
+
+        Parameters:
+            option(bool): True if the option is on. None otherwise.
+        """
+        return
+
+
+class UnionButton(ToggleButton):
+    """ A class representing a type of button which enables or disables
+    union of the displayed minimal cover. Extends ToggleButton."""
+
+    def __init__(self, relative, row_num, col_num):
+        """ Creates a new UnionButton instance and places it in
+        the window. Sets the text as 'Union' and configures visuals.
+
+        Parameters:
+            relative(object): the window in which the button resides
+            row_num(int): the row in which the button resides
+            col_num(int): the column in which the button resides
+        """
+        super().__init__(relative, row_num, col_num, 'Union')
+
+    def toggle(self, option):
+        """ Sets the minimal cover text with or without union.
+
+        Parameters:
+            option(bool): True to use union. None otherwise.
+        """
+        self._relative.set_min_cover_text(option)
+
+
+class FastButton(ToggleButton):
+    """ A class representing a type of button which enables or disables
+    the polynomial-time BCNF decomposition. Extends ToggleButton."""
+
+    def __init__(self, relative, row_num, col_num):
+        """ Creates a new FastButton instance and places it in
+        the window. Sets the text as 'Fast' and configures visuals.
+
+        Parameters:
+            relative(object): the window in which the button resides
+            row_num(int): the row in which the button resides
+            col_num(int): the column in which the button resides
+        """
+        super().__init__(relative, row_num, col_num, 'Fast')
+
+    def toggle(self, option):
+        """ Sets the BCNF decomposition text using the polynomial-time
+        decomposition or not.
+
+        Parameters:
+            option(bool): True to use the polynomial-time decomposition.
+            None otherwise.
+        """
+        self._relative.set_BCNF_text(option)
 
 
 class ImageButton(BaseButton):
@@ -1757,6 +2312,9 @@ class DeletionButton(ImageButton):
             if isinstance(widget, tk.Listbox):
                 # Found the listbox
                 break
+        if widget.curselection():
+            # Discard results found for the relation with dependencies
+            parent.clear_results()
         for dependency in widget.curselection()[::-1]:
             # Work backwards
             # Remove dependency from relation
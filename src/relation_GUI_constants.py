@@ -54,6 +54,7 @@ MIN_NUM_LIST_LINES = 5
 SCROLLED_TEXT_HEIGHT = 1
 TEXT_SPACING = 1
 BUTTON_TEXT_HEIGHT = 1
+TASK_POLL_DELAY = 50
 
 # Relation / Dependency layout constants
 INSERTION_BUTTON_COL = 23
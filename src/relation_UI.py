@@ -3,8 +3,11 @@ __email__ = "work.a.a.johnson@gmail.com"
 __date__ = "27/06/2021"
 
 from set_theory import Set
+from relation import CancelToken
 from relation import Rel
 
+PROGRESS_BAR_WIDTH = 30
+
 
 def extract_info(txt_file, info):
     """Method to extract information from text file
@@ -23,6 +26,49 @@ def extract_info(txt_file, info):
     return txt
 
 
+def print_progress(phase, processed, total, width=0):
+    """Prints a progress bar for a calculation over the current line
+
+    Parameters:
+        phase(str): the name of the algorithm running
+        processed(int): the number of items processed so far
+        total(int): the estimated total number of items
+        width(int): the length of the line printed before, which is
+            overwritten. 0 by default.
+
+    Returns:
+        (int): the length of the line printed
+    """
+    filled = PROGRESS_BAR_WIDTH * processed // max(total, 1)
+    bar = '#' * filled + '-' * (PROGRESS_BAR_WIDTH - filled)
+    line = f'{phase:<14}[{bar}] {processed}/~{total}'.ljust(width)
+    print('\r' + line, end='', flush=True)
+    return len(line)
+
+
+def run_with_progress(compute):
+    """Runs a calculation, showing a progress bar until it is done
+
+    Parameters:
+        compute: a function of a cancellation token which returns
+        the result
+
+    Returns:
+        the result of compute
+    """
+    # The length of the longest line printed
+    width = [0]
+
+    def progress(phase, processed, total):
+        width[0] = print_progress(phase, processed, total, width[0])
+    try:
+        return compute(CancelToken(progress=progress))
+    finally:
+        if width[0]:
+            # Clear the progress bar
+            print('\r' + width[0] * ' ' + '\r', end='', flush=True)
+
+
 def main():
     """Handles top-down interaction with relation.py"""
     f = open('assets/relation_UI.txt', 'r').readlines()
@@ -259,7 +305,7 @@ def main():
                     print(compute[8], select_rel.closure(close_set).elements())
                 # compute candidate keys for relation
                 elif option == '2':
-                    K = select_rel.keys()
+                    K = run_with_progress(select_rel.keys)
                     print(compute[9].format(K.card()), '\n')
                     for i, key in enumerate(K.elements(), 1):
                         print(str(i) + '.', key.elements())
@@ -323,16 +369,18 @@ def main():
                         print(error[0])
                         option = input(decomp[6]).strip()
                     print()
-                    if option.capitalize() == 'Y':
-                        print(select_rel.min_cover(True))
-                    else:
-                        print(select_rel.min_cover())
+                    union = option.capitalize() == 'Y'
+                    print(run_with_progress(
+                        lambda token: select_rel.min_cover(union, token)
+                    ))
                 # perform 3NF decomposition if HNF < 3NF
                 elif option == '2':
-                    print(select_rel.three_NF_decomp())
+                    print(run_with_progress(select_rel.three_NF_decomp))
                 # perform BCNF decomposition if HNF < BCNF
                 elif option == '3':
-                    print(select_rel.BCNF_decomp())
+                    print(run_with_progress(
+                        lambda token: select_rel.BCNF_decomp(None, token)
+                    ))
                 elif option == 'r':
                     panel = 'compute'
                 else:
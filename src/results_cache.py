@@ -0,0 +1,168 @@
+import json
+import sqlite3
+import threading
+
+RESULTS_CACHE_PATH = 'relation_results.sqlite3'
+RESULTS_CACHE_SIZE = 1024
+
+
+class ResultsCache(object):
+    """A class which stores computed results of relations in a SQLite
+    file, keyed by the fingerprint of the relation and the name of the
+    result, so that they persist between runs. The least recently used
+    results are evicted once the cache is full. The cache may be shared
+    between threads."""
+
+    def __init__(self, path=RESULTS_CACHE_PATH, maxsize=RESULTS_CACHE_SIZE):
+        """Construct a results cache, creating the file if necessary.
+
+        Parameters:
+            path(str): the path of the SQLite file. ':memory:' keeps
+            the cache in memory only.
+            maxsize(int>=0): the maximum number of results to hold.
+            0 disables the cache.
+        """
+        self._path = path
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+        # The connection is shared between threads, one at a time
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'fingerprint TEXT NOT NULL, '
+                'name TEXT NOT NULL, '
+                'value TEXT NOT NULL, '
+                'used INTEGER NOT NULL, '
+                'PRIMARY KEY (fingerprint, name))'
+            )
+        row = self._connection.execute(
+            'SELECT COUNT(*), COALESCE(MAX(used), 0) FROM results'
+        ).fetchone()
+        self._size, self._clock = row
+
+    def get(self, fingerprint, name):
+        """Returns the cached result, or None if there is none.
+
+        Parameters:
+            fingerprint(str): the fingerprint of the relation
+            name(str): the name of the result
+
+        Returns:
+            the result, decoded from JSON
+        """
+        with self._lock:
+            try:
+                row = self._connection.execute(
+                    'SELECT value FROM results '
+                    'WHERE fingerprint = ? AND name = ?',
+                    (fingerprint, name)
+                ).fetchone()
+                if row is None:
+                    self._misses += 1
+                    return None
+                self._clock += 1
+                with self._connection:
+                    self._connection.execute(
+                        'UPDATE results SET used = ? '
+                        'WHERE fingerprint = ? AND name = ?',
+                        (self._clock, fingerprint, name)
+                    )
+            except sqlite3.Error:
+                # An unreadable cache is treated as empty
+                self._misses += 1
+                return None
+            self._hits += 1
+        return json.loads(row[0])
+
+    def put(self, fingerprint, name, value):
+        """Caches a result, evicting the least recently used results if
+        the cache is full.
+
+        Parameters:
+            fingerprint(str): the fingerprint of the relation
+            name(str): the name of the result
+            value: the result, using only lists, strings, numbers,
+            booleans, None and dictionaries
+        """
+        if self._maxsize <= 0:
+            return
+        with self._lock:
+            self._clock += 1
+            try:
+                with self._connection:
+                    cursor = self._connection.execute(
+                        'UPDATE results SET value = ?, used = ? '
+                        'WHERE fingerprint = ? AND name = ?',
+                        (json.dumps(value), self._clock, fingerprint, name)
+                    )
+                    if cursor.rowcount == 0:
+                        self._connection.execute(
+                            'INSERT INTO results VALUES (?, ?, ?, ?)',
+                            (fingerprint, name, json.dumps(value),
+                             self._clock)
+                        )
+                        self._size += 1
+                if self._size > self._maxsize:
+                    self._evict()
+            except sqlite3.Error:
+                # Results are only cached on a best effort basis
+                return
+
+    def _evict(self):
+        """Evict the least recently used results until the cache holds
+        at most maxsize results. The lock must be held."""
+        with self._connection:
+            # Other processes may share the file
+            self._size = self._connection.execute(
+                'SELECT COUNT(*) FROM results'
+            ).fetchone()[0]
+            excess = self._size - max(self._maxsize, 0)
+            if excess > 0:
+                self._connection.execute(
+                    'DELETE FROM results WHERE rowid IN ('
+                    'SELECT rowid FROM results ORDER BY used LIMIT ?)',
+                    (excess,)
+                )
+                self._size -= excess
+
+    def resize(self, maxsize):
+        """Sets the maximum number of results to hold, evicting the
+        least recently used results as needed.
+
+        Parameters:
+            maxsize(int>=0): the maximum number of results to hold.
+        """
+        with self._lock:
+            self._maxsize = maxsize
+            try:
+                self._evict()
+            except sqlite3.Error:
+                return
+
+    def clear(self):
+        """Discard every cached result."""
+        with self._lock:
+            try:
+                with self._connection:
+                    self._connection.execute('DELETE FROM results')
+                self._size = 0
+            except sqlite3.Error:
+                return
+
+    def info(self):
+        """Returns the cache statistics.
+
+        Returns:
+            (tuple<int, int, int, int>): the number of hits, the number
+            of misses, the maximum size and the current size
+        """
+        with self._lock:
+            return (self._hits, self._misses, self._maxsize, self._size)
+
+    def close(self):
+        """Close the SQLite file. The cache must not be used after."""
+        with self._lock:
+            self._connection.close()
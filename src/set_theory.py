@@ -2,33 +2,40 @@ __author__ = "Alexander Johnson"
 __email__ = "work.a.a.johnson@gmail.com"
 __date__ = "20/06/2021"
 
+from itertools import chain
+from itertools import combinations
+
 
 class Set(object):
     """A class which implements sets and basic set theory operations."""
 
     def __init__(self, *args):
-        """Construct a set using the list data type. Set contains only
-        distinct elements.
+        """Construct a set using the dict data type as a hash set. Set
+        contains only distinct elements, ordered by their last
+        occurrence in args.
 
         Parameters:
             args: a hashable element of the set.
         """
-        S = []
-        for element in args:
-            S.append(element)
-        S_dupes = []
-        S_copy = S.copy()
-        for entry in S:
-            S_count = S.count(entry)
-            if S_count > 1:
-                if S_dupes.count(entry) - S_count < -1:
-                    S_dupes.append(entry)
-                    S_copy.remove(entry)
-        self._Set = S_copy
+        S = dict.fromkeys(args)
+        if len(S) != len(args):
+            # Keep only the last occurrence of any duplicates
+            S = dict.fromkeys(reversed(dict.fromkeys(reversed(args))))
+        self._Set = S
+        self._reset_views()
+
+    def _reset_views(self):
+        """Discard the cached list, sorted and hash views of the set.
+        Must be called whenever the underlying hash set is modified."""
+        self._list = None
+        self._sorted = None
+        self._hash = None
 
     def elements(self):
         """(list) Returns a list of elements in the set"""
-        return self._Set
+        if self._list is None:
+            self._list = list(self._Set)
+        return self._list
 
     def card(self):
         """(int) Return the cardinality of the set"""
@@ -36,14 +43,14 @@ class Set(object):
 
     def copy(self):
         """Create a copy of the set"""
-        S_copy = Set(*self.elements().copy())
+        S_copy = Set(*self._Set)
         return S_copy
 
     def sort(self):
         """Sort elements in the set"""
-        S = self._Set.copy()
-        S.sort()
-        return Set(*S)
+        if self._sorted is None:
+            self._sorted = sorted(self._Set)
+        return Set(*self._sorted)
 
     def union(self, other):
         """Return a set 'S' such that for every 'x' in set 1, and every
@@ -52,15 +59,13 @@ class Set(object):
         Returns:
             (Set) A set containing all elements in both sets.
         """
-        S = []
-        for element in self._Set + other._Set:
-            S.append(element)
-        return Set(*S)
+        return Set(*self._Set, *other._Set)
 
     def append(self, other):
         """Analogous to union except self is overwritten by the set
         formed through union."""
         self._Set = self.union(other)._Set
+        self._reset_views()
 
     def intersect(self, other):
         """Return a set 'S' such that for every 'x' in set 1 and set 2,
@@ -69,13 +74,8 @@ class Set(object):
         Returns:
             (Set) A set containing all common elements in both sets.
         """
-        S = []
-        for x in self._Set:
-            for y in other._Set:
-                if x == y:
-                    S.append(x)
-                    break
-        return Set(*S)
+        S = other._Set
+        return Set(*[x for x in self._Set if x in S])
 
     def __sub__(self, other):
         """Return a set 'S' such that for every 'x' in set 1 that is not
@@ -85,28 +85,27 @@ class Set(object):
             (Set): A set formed from the set difference of set 1 and
             set 2.
         """
-        S = []
-        I = self.intersect(other)
-        for entry in self.elements():
-            if not Set(entry).subset(I):
-                S.append(entry)
-        return Set(*S)
+        S = other._Set
+        return Set(*[x for x in self._Set if x not in S])
 
     def subset(self, other):
         """(bool) Return True if set 1 is a subset of set 2.
         False otherwise.
         """
-        I = self.intersect(other)
-        if I.card() == self.card():
-            return True
-        else:
-            return False
+        return self._Set.keys() <= other._Set.keys()
 
     def __eq__(self, other):
         """Return true iff set 1 and set 2 contain the same elements"""
-        if self.subset(other) and other.subset(self):
-            return True
-        return False
+        if not isinstance(other, Set):
+            return NotImplemented
+        return self._Set.keys() == other._Set.keys()
+
+    def __hash__(self):
+        """Return a hash of the elements in the set, so that sets can
+        themselves be elements of a set."""
+        if self._hash is None:
+            self._hash = hash(frozenset(self._Set))
+        return self._hash
 
     def partition(self, num):
         """Partitions the set into all unique subsets which can be
@@ -121,36 +120,26 @@ class Set(object):
         Returns:
             list<set>: a list of partitions
         """
+        part_set = self.iter_partition(num)
+        if isinstance(part_set, Exception):
+            return part_set
+        return list(part_set)
+
+    def iter_partition(self, num):
+        """Analogous to partition except the subsets are generated
+        lazily, in the same order.
+
+        Parameters:
+            num(int): the number of elements in the subset
+
+        Returns:
+            generator<set>: a generator of partitions
+        """
         if num < 0 or not isinstance(num, int):
             return TypeError('num must be a non-negtive integer')
         elif num > self.card():
             return ValueError('num cannot exceed cardinality of set')
-        if num == 0:
-            return [Set()]
-        part_set = []
-        ele = self.elements()
-        if num == 1:
-            for i in ele:
-                part_set.append(Set(i))
-            return part_set
-        indexes = []
-        for i in range(num):
-            indexes.append(i)
-        while indexes[0] != self.card() - num + 1:
-            part = []
-            for i in indexes:
-                part.append(ele[i])
-            part_set.append(Set(*part))
-            if indexes[-1] % (self.card() - 1) == 0:
-                for i, j in enumerate(indexes[1:], 1):
-                    if j % (self.card() + i - num) == 0:
-                        indexes[i - 1] += 1
-                        for k in range(len(indexes[i:])):
-                            indexes[i + k] = indexes[i - 1] + k + 1
-                        break
-            else:
-                indexes[-1] += 1
-        return part_set
+        return (Set(*part) for part in combinations(self.elements(), num))
 
     def power_set(self, num=None):
         """Computes the power set of self; i.e., a list containing all
@@ -165,16 +154,32 @@ class Set(object):
         Returns:
             list<set>: the power set of self
         """
+        power_set = self.iter_power_set(num)
+        if isinstance(power_set, Exception):
+            return power_set
+        return list(power_set)
+
+    def iter_power_set(self, num=None):
+        """Analogous to power_set except the subsets are generated
+        lazily, in the same order.
+
+        Parameters:
+            num(int>=0): the size cut-off for subsets to include
+            in the power set. None by default.
+
+        Returns:
+            generator<set>: a generator of the power set of self
+        """
         if num is not None:
             if num < 0 or not isinstance(num, int):
                 return TypeError('num must be a non-negtive integer')
-        power_set = []
-        for i in range(self.card() + 1):
-            power_set.extend(self.partition(i))
-            if i == num:
-                break
-        return power_set
+        max_num = self.card()
+        if num is not None and num < max_num:
+            max_num = num
+        return chain.from_iterable(
+            self.iter_partition(i) for i in range(max_num + 1)
+        )
 
     def __repr__(self):
         """The string representation of the set."""
-        return 'Set' + str(self._Set)
+        return 'Set' + str(self.elements())
@@ -0,0 +1,119 @@
+"""Random relations and brute force answers shared by the checks.
+
+Run the checks from the repository root with:
+    python -m unittest discover -s tests
+"""
+
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from relation import Rel
+
+
+def random_relation(rnd, max_attr=7, max_FD=7):
+    """Returns a relation with random attributes and FD's.
+
+    Parameters:
+        rnd(Random): the random number generator
+        max_attr(int>=2): the maximum number of attributes
+        max_FD(int>=0): the maximum number of FD's
+
+    Returns:
+        (Rel): the relation
+    """
+    attrs = [chr(ord('A') + i) for i in range(rnd.randint(2, max_attr))]
+    R = Rel(*attrs)
+    for _ in range(rnd.randint(0, max_FD)):
+        LHS = rnd.sample(attrs, rnd.randint(1, min(3, len(attrs) - 1)))
+        rest = [attr for attr in attrs if attr not in LHS]
+        R.add_FD(LHS, rnd.sample(rest, rnd.randint(1, min(2, len(rest)))))
+    return R
+
+
+def naive_closure(R, attrs):
+    """Returns the closure of attributes by applying every FD of R until
+    nothing changes.
+
+    Parameters:
+        R(Rel): the relation
+        attrs(iterable): attributes of the relation
+
+    Returns:
+        (set): the closure of the attributes
+    """
+    close = set(attrs)
+    FD_LHS = [set(LHS.elements()) for LHS in R.FD_LHS()]
+    FD_RHS = [set(RHS.elements()) for RHS in R.FD_RHS()]
+    changed = True
+    while changed:
+        changed = False
+        for index, LHS in enumerate(FD_LHS):
+            if LHS <= close and not FD_RHS[index] <= close:
+                close |= FD_RHS[index]
+                changed = True
+    return close
+
+
+def subsets(attrs):
+    """Generate every subset of a list of attributes."""
+    for num in range(len(attrs) + 1):
+        yield from itertools.combinations(attrs, num)
+
+
+def naive_keys(R):
+    """Returns every candidate key of R, by testing each subset of the
+    attributes in order of size.
+
+    Parameters:
+        R(Rel): the relation
+
+    Returns:
+        (list<set>): the candidate keys
+    """
+    attrs = R.attributes_list()
+    keys = []
+    for subset in subsets(attrs):
+        if any(key <= set(subset) for key in keys):
+            continue
+        if naive_closure(R, subset) == set(attrs):
+            keys.append(set(subset))
+    return keys
+
+
+def FD_pairs(R):
+    """Returns the FD's of R split to a single RHS attribute.
+
+    Parameters:
+        R(Rel): the relation
+
+    Returns:
+        (set<tuple<frozenset, str>>): the LHS and RHS of each FD
+    """
+    pairs = set()
+    FD_RHS = R.FD_RHS()
+    for index, LHS in enumerate(R.FD_LHS()):
+        for attr in FD_RHS[index].elements():
+            pairs.add((frozenset(LHS.elements()), attr))
+    return pairs
+
+
+def equivalent(R_1, R_2):
+    """Returns True iff the FD's of R_1 and R_2 have the same closures.
+
+    Parameters:
+        R_1(Rel): a relation
+        R_2(Rel): a relation with the same attributes
+
+    Returns:
+        (bool): True if the covers are equivalent
+    """
+    for LHS, attr in FD_pairs(R_1):
+        if attr not in naive_closure(R_2, LHS):
+            return False
+    for LHS, attr in FD_pairs(R_2):
+        if attr not in naive_closure(R_1, LHS):
+            return False
+    return True
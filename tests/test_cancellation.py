@@ -0,0 +1,131 @@
+import unittest
+
+from brute_force import equivalent
+from brute_force import naive_keys
+from relation import CancelToken
+from relation import Rel
+from relation import RelTimeout
+from set_theory import Set
+
+
+def many_keys():
+    """Returns a relation on A0 ... A5 and B0 ... B5 with FD's A_i -> B_i
+    and B_i -> A_i, which has 64 candidate keys.
+
+    Returns:
+        (Rel): the relation
+    """
+    attrs = []
+    for i in range(6):
+        attrs += [f'A{i}', f'B{i}']
+    R = Rel(*attrs)
+    for i in range(6):
+        R.add_FD([f'A{i}'], [f'B{i}'])
+        R.add_FD([f'B{i}'], [f'A{i}'])
+    return R
+
+
+def not_BCNF():
+    """Returns a relation in 1NF, so that each decomposition has work to
+    do.
+
+    Returns:
+        (Rel): the relation
+    """
+    R = Rel('A', 'B', 'C', 'D', 'E')
+    R.add_FD(['A'], ['B'])
+    R.add_FD(['B'], ['C'])
+    R.add_FD(['C', 'D'], ['E'])
+    R.add_FD(['A', 'C'], ['B', 'E'])
+    return R
+
+
+class TestCancelToken(unittest.TestCase):
+    """Cancellation tokens which expire once cancelled or once their
+    deadline has passed."""
+
+    def test_cancel(self):
+        token = CancelToken()
+        self.assertFalse(token.expired())
+        self.assertFalse(token.check('keys', 0, 1))
+        token.cancel()
+        self.assertTrue(token.expired())
+        self.assertTrue(token.check('keys', 0, 1))
+
+    def test_timeout(self):
+        self.assertTrue(CancelToken(0).expired())
+        self.assertFalse(CancelToken(3600).expired())
+
+
+class TestCancelled(unittest.TestCase):
+    """Algorithms stopped by an expired token."""
+
+    def test_operations(self):
+        operations = {
+            'keys': lambda R, token: R.keys(token),
+            'min_cover': lambda R, token: R.min_cover(None, token),
+            'minimum_cover': lambda R, token: R.minimum_cover(token),
+            'three_NF_decomp':
+                lambda R, token: R.three_NF_decomposition(token),
+            'BCNF_decomp': lambda R, token: R.BCNF_decomposition(None, token),
+        }
+        for operation, compute in operations.items():
+            R = not_BCNF()
+            token = CancelToken()
+            token.cancel()
+            with self.assertRaises(RelTimeout) as context:
+                compute(R, token)
+            self.assertEqual(context.exception.operation, operation)
+            # Nothing is kept from the cancelled run
+            self.assertEqual(str(compute(R, None)),
+                             str(compute(not_BCNF(), None)))
+
+    def test_report(self):
+        R = not_BCNF()
+        token = CancelToken()
+        token.cancel()
+        with self.assertRaises(RelTimeout):
+            R.normal_form_report(token)
+        with self.assertRaises(RelTimeout):
+            R.BCNF_decomposition(True, token)
+        with self.assertRaises(RelTimeout):
+            list(R.iter_keys(token))
+        self.assertEqual(R.highest_NF(), '1NF')
+
+    def test_partial_keys(self):
+        R = many_keys()
+        checks = []
+
+        def progress(phase, processed, total):
+            checks.append(phase)
+            if len(checks) == 10:
+                token.cancel()
+        token = CancelToken(progress=progress, interval=0)
+        with self.assertRaises(RelTimeout) as context:
+            R.keys(token)
+        partial = context.exception.partial
+        self.assertLess(0, len(partial))
+        self.assertLess(len(partial), 64)
+        keys = naive_keys(R)
+        for key in partial:
+            self.assertIn(set(key.elements()), keys)
+        self.assertEqual(R.keys().card(), 64)
+
+    def test_partial_cover(self):
+        R = not_BCNF()
+        token = CancelToken(progress=lambda *args: token.cancel(),
+                            interval=0)
+        with self.assertRaises(RelTimeout) as context:
+            R.minimum_cover(token)
+        self.assertTrue(equivalent(context.exception.partial, R))
+
+    def test_infer_FD(self):
+        R = not_BCNF()
+        token = CancelToken()
+        token.cancel()
+        with self.assertRaises(RelTimeout):
+            R.infer_FD(Set('A', 'B', 'C'), token)
+
+
+if __name__ == '__main__':
+    unittest.main()
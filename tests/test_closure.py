@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from brute_force import naive_closure
+from brute_force import random_relation
+from brute_force import subsets
+import relation
+from relation import Rel
+from set_theory import Set
+
+
+class TestClosure(unittest.TestCase):
+    """Closures found by the linear closure."""
+
+    def test_closure(self):
+        rnd = random.Random(1)
+        for _ in range(200):
+            R = random_relation(rnd)
+            for attrs in subsets(R.attributes_list()):
+                self.assertEqual(set(R.closure(Set(*attrs)).elements()),
+                                 naive_closure(R, attrs))
+
+    def test_closure_ignore(self):
+        rnd = random.Random(6)
+        for _ in range(200):
+            R = random_relation(rnd)
+            for num in range(1, R.num_FD() + 1):
+                LHS = R.FD_LHS()[num - 1].elements()
+                R_without = R.copy()
+                R_without.remove_FD(num)
+                self.assertEqual(
+                    set(R.closure(Set(*LHS), num).elements()),
+                    naive_closure(R_without, LHS)
+                )
+
+
+class TestBatchClosures(unittest.TestCase):
+    """Closures computed in batches."""
+
+    def check_closures(self, vectorize):
+        rnd = random.Random(2)
+        for _ in range(200):
+            R = random_relation(rnd)
+            sets = [Set(*attrs) for attrs in subsets(R.attributes_list())]
+            # Repeated sets share a closure
+            sets += sets[:3]
+            close_sets = R.closures(sets, vectorize)
+            self.assertEqual(len(close_sets), len(sets))
+            for index, set_attr in enumerate(sets):
+                self.assertEqual(set(close_sets[index].elements()),
+                                 naive_closure(R, set_attr.elements()))
+
+    def test_closures(self):
+        self.check_closures(False)
+
+    @unittest.skipIf(relation.numpy is None, 'NumPy is not installed')
+    def test_closures_vectorized(self):
+        self.check_closures(True)
+
+    @unittest.skipIf(relation.numpy is not None, 'NumPy is installed')
+    def test_closures_vectorized_without_numpy(self):
+        R = Rel('A', 'B')
+        self.assertIsInstance(R.closures([Set('A')], True), ImportError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from brute_force import naive_closure
+from brute_force import random_relation
+from relation import Rel
+from set_theory import Set
+
+
+class TestClosureSession(unittest.TestCase):
+    """Incremental closures under random additions, removals and
+    modifications of the relation."""
+
+    def test_session(self):
+        rnd = random.Random(3)
+        for _ in range(100):
+            R = random_relation(rnd)
+            attrs = R.attributes_list()
+            session = R.closure_session()
+            selected = set()
+            for _ in range(40):
+                step = rnd.random()
+                attr = rnd.choice(attrs)
+                if step < 0.4:
+                    session.add(attr)
+                    selected.add(attr)
+                elif step < 0.8:
+                    session.remove(attr)
+                    selected.discard(attr)
+                elif step < 0.95:
+                    selected = set(rnd.sample(attrs,
+                                              rnd.randint(0, len(attrs))))
+                    session.update(Set(*selected))
+                else:
+                    # The session rebuilds once the relation changes
+                    rest = [other for other in attrs if other != attr]
+                    R.add_FD([attr], [rnd.choice(rest)])
+                close = naive_closure(R, selected)
+                self.assertEqual(set(session.selected().elements()), selected)
+                self.assertEqual(set(session.closure().elements()), close)
+                self.assertEqual(session.super_key(), close == set(attrs))
+
+    def test_invalid_attribute(self):
+        session = Rel('A', 'B').closure_session()
+        self.assertIsInstance(session.add('C'), ValueError)
+        self.assertIsInstance(session.remove('C'), ValueError)
+        self.assertIsInstance(session.update(Set('C')), ValueError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import random
+import unittest
+
+from brute_force import FD_pairs
+from brute_force import equivalent
+from brute_force import naive_closure
+from brute_force import random_relation
+from relation import Rel
+
+
+class TestMinCover(unittest.TestCase):
+    """Minimal covers, with and without union."""
+
+    def check_minimal(self, R_min):
+        pairs = FD_pairs(R_min)
+        for LHS, attr in pairs:
+            self.assertNotIn(attr, LHS)
+            # Every attribute of the LHS is needed
+            for other in LHS:
+                self.assertNotIn(attr, naive_closure(R_min, LHS - {other}))
+        # Every FD is needed
+        for num in range(1, R_min.num_FD() + 1):
+            R_without = R_min.copy()
+            R_without.remove_FD(num)
+            self.assertFalse(equivalent(R_without, R_min))
+
+    def test_min_cover(self):
+        rnd = random.Random(14)
+        for _ in range(200):
+            R = random_relation(rnd)
+            R_min = R.min_cover()
+            self.assertTrue(equivalent(R_min, R))
+            for RHS in R_min.FD_RHS():
+                self.assertEqual(RHS.card(), 1)
+            self.check_minimal(R_min)
+
+    def test_min_cover_union(self):
+        rnd = random.Random(15)
+        for _ in range(200):
+            R = random_relation(rnd)
+            R_union = R.min_cover(True)
+            self.assertTrue(equivalent(R_union, R))
+            self.assertEqual(FD_pairs(R_union), FD_pairs(R.min_cover()))
+            LHS_list = [frozenset(LHS.elements()) for LHS in R_union.FD_LHS()]
+            self.assertEqual(len(LHS_list), len(set(LHS_list)))
+            self.check_minimal(R_union)
+
+
+class TestMinimumCover(unittest.TestCase):
+    """Minimum covers found by the algorithm of Maier."""
+
+    def test_minimum_cover(self):
+        rnd = random.Random(16)
+        for _ in range(200):
+            R = random_relation(rnd)
+            R_minimum = R.minimum_cover()
+            self.assertTrue(equivalent(R_minimum, R))
+            self.assertLessEqual(R_minimum.num_FD(),
+                                 R.min_cover(True).num_FD())
+            for num in range(1, R_minimum.num_FD() + 1):
+                R_without = R_minimum.copy()
+                R_without.remove_FD(num)
+                self.assertFalse(equivalent(R_without, R_minimum))
+
+    def test_fewer_FD(self):
+        # BC and AC share a closure, and A -> B gives BC from AC, so
+        # AC -> D is merged into BC -> A
+        R = Rel('A', 'B', 'C', 'D')
+        R.add_FD(['A'], ['B'])
+        R.add_FD(['B', 'C'], ['A'])
+        R.add_FD(['A', 'C'], ['D'])
+        self.assertEqual(R.min_cover(True).num_FD(), 3)
+        R_minimum = R.minimum_cover()
+        self.assertEqual(R_minimum.num_FD(), 2)
+        self.assertTrue(equivalent(R_minimum, R))
+
+
+if __name__ == '__main__':
+    unittest.main()
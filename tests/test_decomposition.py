@@ -0,0 +1,255 @@
+import json
+import random
+import unittest
+
+from brute_force import FD_pairs
+from brute_force import naive_closure
+from brute_force import random_relation
+from brute_force import subsets
+from relation import Decomposition
+from relation import Rel
+
+
+def projected_FD(R, attrs):
+    """Returns every FD with a single RHS attribute which holds on the
+    attributes of R, by testing the closure of each subset.
+
+    Parameters:
+        R(Rel): the relation
+        attrs(iterable): attributes of the relation
+
+    Returns:
+        (set<tuple<frozenset, str>>): the LHS and RHS of each FD
+    """
+    attrs = set(attrs)
+    pairs = set()
+    for LHS in subsets(sorted(attrs)):
+        for attr in naive_closure(R, LHS) & attrs - set(LHS):
+            pairs.add((frozenset(LHS), attr))
+    return pairs
+
+
+def naive_BCNF(R, attrs):
+    """Returns True iff the FD's of R which hold on the attributes are
+    all in BCNF, by testing the closure of each subset.
+
+    Parameters:
+        R(Rel): the relation
+        attrs(iterable): attributes of the relation
+
+    Returns:
+        (bool): True if the attributes are in BCNF
+    """
+    attrs = set(attrs)
+    for LHS in subsets(sorted(attrs)):
+        close = naive_closure(R, LHS) & attrs
+        if close != set(LHS) and close != attrs:
+            return False
+    return True
+
+
+def naive_3NF(R, attrs):
+    """Returns True iff the FD's of R which hold on the attributes are
+    all in 3NF, by testing the closure of each subset.
+
+    Parameters:
+        R(Rel): the relation
+        attrs(iterable): attributes of the relation
+
+    Returns:
+        (bool): True if the attributes are in 3NF
+    """
+    attrs = set(attrs)
+    keys = []
+    for LHS in subsets(sorted(attrs)):
+        if not any(key <= set(LHS) for key in keys) \
+                and naive_closure(R, LHS) >= attrs:
+            keys.append(set(LHS))
+    prime = set().union(*keys)
+    for LHS in subsets(sorted(attrs)):
+        close = naive_closure(R, LHS)
+        if close >= attrs:
+            continue
+        if close & attrs - set(LHS) - prime:
+            return False
+    return True
+
+
+def lossless(R, relations):
+    """Returns True iff the join of the relations is lossless under the
+    FD's of R, by the chase.
+
+    Parameters:
+        R(Rel): the relation
+        relations(list<Rel>): the relations of a decomposition of R
+
+    Returns:
+        (bool): True if the decomposition is lossless
+    """
+    attrs = R.attributes_list()
+    rows = []
+    for index, rel in enumerate(relations):
+        rel_attrs = rel.attributes_list()
+        # Distinguished symbols are 0, the others the row number
+        rows.append({attr: 0 if attr in rel_attrs else index + 1
+                     for attr in attrs})
+    pairs = FD_pairs(R)
+    changed = True
+    while changed:
+        changed = False
+        for LHS, attr in pairs:
+            for row_1 in rows:
+                for row_2 in rows:
+                    if row_1[attr] == row_2[attr]:
+                        continue
+                    if all(row_1[other] == row_2[other] for other in LHS):
+                        old, new = sorted([row_1[attr], row_2[attr]],
+                                          reverse=True)
+                        for row in rows:
+                            if row[attr] == old:
+                                row[attr] = new
+                        changed = True
+    return any(not any(row.values()) for row in rows)
+
+
+class TestBCNFDecomposition(unittest.TestCase):
+    """BCNF decompositions, exact and by the algorithm of Tsou and
+    Fischer."""
+
+    def test_BCNF_pair(self):
+        rnd = random.Random(19)
+        for _ in range(200):
+            R = random_relation(rnd)
+            for attrs in subsets(R.attributes_list()):
+                pair = R._BCNF_pair(R._universe.encode(list(attrs)))
+                if pair is None:
+                    self.assertTrue(naive_BCNF(R, attrs))
+                    continue
+                attr, other = [R._universe.decode(mask)[0] for mask in pair]
+                self.assertNotEqual(attr, other)
+                rest = set(attrs) - {attr, other}
+                self.assertIn(attr, naive_closure(R, rest))
+
+    def check_decomposition(self, R, decomposition):
+        relations = decomposition.get_relations()
+        if R.highest_NF() == 'BCNF':
+            self.assertFalse(decomposition.is_decomposed())
+            return
+        attrs = set()
+        preserved = Rel(*R.attributes_list())
+        for rel in relations:
+            self.assertTrue(naive_BCNF(R, rel.attributes_list()))
+            attrs |= set(rel.attributes_list())
+            for LHS, attr in projected_FD(R, rel.attributes_list()):
+                preserved.add_FD(list(LHS), [attr])
+        self.assertEqual(attrs, set(R.attributes_list()))
+        self.assertTrue(lossless(R, relations))
+        # Attributes lost by each FD of the minimal cover
+        lost = []
+        R_min = R.min_cover(True)
+        for LHS in R_min.FD_LHS():
+            LHS = LHS.elements()
+            attr_lost = naive_closure(R, LHS) - naive_closure(preserved, LHS)
+            if attr_lost:
+                lost.append((set(LHS), attr_lost))
+        self.assertEqual([(set(LHS.elements()), set(RHS.elements()))
+                          for LHS, RHS in decomposition.get_lost_FD()], lost)
+
+    def test_BCNF_decomposition(self):
+        rnd = random.Random(20)
+        for _ in range(100):
+            R = random_relation(rnd, 6)
+            decomposition = R.BCNF_decomposition()
+            self.check_decomposition(R, decomposition)
+            for rel in decomposition.get_relations():
+                self.assertEqual(FD_pairs(rel),
+                                 FD_pairs(rel.min_cover(True)))
+                # Each relation holds the FD's of R on its attributes
+                self.assertEqual(projected_FD(rel, rel.attributes_list()),
+                                 projected_FD(R, rel.attributes_list()))
+
+    def test_BCNF_decomposition_fast(self):
+        rnd = random.Random(21)
+        for _ in range(100):
+            R = random_relation(rnd, 6)
+            decomposition = R.BCNF_decomposition(True)
+            self.check_decomposition(R, decomposition)
+            for rel in decomposition.get_relations():
+                # Only the FD used to form the relation is listed
+                self.assertLessEqual(rel.num_FD(), 1)
+
+
+class TestThreeNFDecomposition(unittest.TestCase):
+    """3NF decompositions synthesised from the minimal cover."""
+
+    def check_decomposition(self, R, decomposition):
+        if R.highest_NF() in ['3NF', 'BCNF']:
+            self.assertFalse(decomposition.is_decomposed())
+            return
+        relations = decomposition.get_relations()
+        for rel in relations:
+            self.assertTrue(naive_3NF(R, rel.attributes_list()))
+        self.assertTrue(lossless(R, relations))
+        # Every FD is preserved
+        preserved = Rel(*R.attributes_list())
+        for rel in relations:
+            for LHS, attr in FD_pairs(rel):
+                preserved.add_FD(list(LHS), [attr])
+        for LHS, attr in FD_pairs(R):
+            self.assertIn(attr, naive_closure(preserved, LHS))
+        key_relation = decomposition.get_key_relation()
+        if key_relation is not None:
+            self.assertIn(key_relation, relations)
+            self.assertEqual(
+                naive_closure(R, key_relation.attributes_list()),
+                set(R.attributes_list())
+            )
+
+    def test_three_NF_decomposition(self):
+        rnd = random.Random(22)
+        for _ in range(200):
+            R = random_relation(rnd)
+            self.check_decomposition(R, R.three_NF_decomposition())
+
+    def test_merged_relations(self):
+        # Relations merged into one another used to crash the synthesis
+        R = Rel('A', 'B', 'C', 'D', 'E', 'F')
+        R.add_FD(['A'], ['C', 'F'])
+        R.add_FD(['E', 'F'], ['D'])
+        R.add_FD(['A', 'B', 'D'], ['C', 'E'])
+        R.add_FD(['B', 'F'], ['D'])
+        R.add_FD(['D'], ['F'])
+        R.add_FD(['C', 'F'], ['D', 'E'])
+        decomposition = R.three_NF_decomposition()
+        self.check_decomposition(R, decomposition)
+        self.assertEqual(
+            [set(rel.attributes_list())
+             for rel in decomposition.get_relations()],
+            [{'A', 'C', 'F'}, {'D', 'E', 'F'}, {'B', 'D', 'F'},
+             {'C', 'E', 'F'}, {'A', 'B'}]
+        )
+
+
+class TestDecompositionDict(unittest.TestCase):
+    """Decompositions converted to dictionaries and back."""
+
+    def test_round_trip(self):
+        rnd = random.Random(23)
+        for _ in range(100):
+            R = random_relation(rnd, 6)
+            for decomposition in [R.three_NF_decomposition(),
+                                  R.BCNF_decomposition(),
+                                  R.BCNF_decomposition(True)]:
+                data = json.loads(json.dumps(decomposition.to_dict()))
+                copy = Decomposition.from_dict(data)
+                self.assertEqual(copy.to_dict(), decomposition.to_dict())
+                self.assertEqual(copy.get_text(), decomposition.get_text())
+                key_relation = decomposition.get_key_relation()
+                if key_relation is not None:
+                    index = decomposition.get_relations().index(key_relation)
+                    self.assertIs(copy.get_key_relation(),
+                                  copy.get_relations()[index])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import random
+import unittest
+
+from brute_force import naive_keys
+from brute_force import random_relation
+from relation import CancelToken
+from relation import Rel
+
+
+class TestKeys(unittest.TestCase):
+    """Candidate keys found by the algorithm of Lucchesi and Osborn."""
+
+    def test_keys(self):
+        rnd = random.Random(4)
+        for _ in range(200):
+            R = random_relation(rnd)
+            found = [set(key.elements()) for key in R.keys().elements()]
+            self.assertCountEqual(found, naive_keys(R))
+
+    def test_keys_by_size(self):
+        rnd = random.Random(7)
+        for _ in range(100):
+            R = random_relation(rnd)
+            sizes = [key.card() for key in R.keys().elements()]
+            self.assertEqual(sizes, sorted(sizes))
+
+    def test_many_keys(self):
+        # Each pair A_i <-> B_i doubles the number of keys
+        attrs = []
+        for i in range(6):
+            attrs += [f'A{i}', f'B{i}']
+        R = Rel(*attrs)
+        for i in range(6):
+            R.add_FD([f'A{i}'], [f'B{i}'])
+            R.add_FD([f'B{i}'], [f'A{i}'])
+        self.assertEqual(R.keys().card(), 2 ** 6)
+
+
+class TestIterKeys(unittest.TestCase):
+    """Candidate keys generated as soon as they are found."""
+
+    def test_iter_keys(self):
+        rnd = random.Random(8)
+        for _ in range(200):
+            R = random_relation(rnd)
+            keys = list(R.iter_keys())
+            self.assertCountEqual(keys, R.keys().elements())
+            # Keys already enumerated are generated again in order
+            self.assertEqual(list(R.iter_keys()), keys)
+
+    def test_shared_keys(self):
+        rnd = random.Random(9)
+        for _ in range(200):
+            R = random_relation(rnd)
+            R_copy = R.copy()
+            R_copy.normal_form_report()
+            self.assertEqual(R_copy.keys(), R.keys())
+            self.assertCountEqual(list(R_copy.iter_keys()),
+                                  R.keys().elements())
+
+    def test_early_stop(self):
+        R = Rel('A', 'B', 'C')
+        R.add_FD(['A'], ['B'])
+        R.add_FD(['B'], ['C'])
+        R.add_FD(['C'], ['A'])
+        self.assertEqual(next(R.iter_keys()).card(), 1)
+        # Stopping early keeps no partial list of keys
+        self.assertEqual(R.keys().card(), 3)
+
+    def test_cancel_after_report(self):
+        attrs = 'ABCDEFGH'
+        R = Rel(*attrs)
+        for index, attr in enumerate(attrs):
+            R.add_FD([attr], [attrs[index - 1]])
+        token = CancelToken()
+        R.normal_form_report(token)
+        token.cancel()
+        # The keys left by the report do not belong to its token
+        found = [set(key.elements()) for key in R.keys().elements()]
+        self.assertCountEqual(found, naive_keys(R))
+
+
+if __name__ == '__main__':
+    unittest.main()
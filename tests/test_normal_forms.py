@@ -0,0 +1,143 @@
+import random
+import unittest
+
+from brute_force import naive_closure
+from brute_force import naive_keys
+from brute_force import random_relation
+from relation import CancelToken
+from relation import NORMAL_FORMS
+from relation import NormalFormReport
+from relation import Rel
+from relation import RelTimeout
+
+
+def naive_violations(R):
+    """Returns every violation of 2NF, 3NF and BCNF in R, by testing
+    each FD against the brute force keys.
+
+    Parameters:
+        R(Rel): the relation
+
+    Returns:
+        (list<tuple<str, int, str>>): the normal form violated, the
+        index of the FD and the first non-prime attribute of its RHS,
+        or None for a violation of BCNF
+    """
+    attrs = set(R.attributes_list())
+    keys = naive_keys(R)
+    prime = set().union(*keys)
+    violations = []
+    for index, LHS in enumerate(R.FD_LHS()):
+        LHS = set(LHS.elements())
+        if naive_closure(R, LHS) == attrs:
+            continue
+        violations.append(('BCNF', index, None))
+        non_prime = [attr for attr in R.FD_RHS()[index].elements()
+                     if attr not in prime]
+        if not non_prime:
+            continue
+        violations.append(('3NF', index, non_prime[0]))
+        if any(LHS < key for key in keys):
+            violations.append(('2NF', index, non_prime[0]))
+    return violations
+
+
+def parse_list(string):
+    """Returns the set of elements of a list printed by get_list_string."""
+    return set(string[1:-1].split(', '))
+
+
+class TestNormalFormReport(unittest.TestCase):
+    """Normal form reports built from the first violation of each
+    normal form."""
+
+    def check_violation(self, R, normal_form, violation, expected):
+        self.assertEqual(violation[0], expected[1])
+        self.assertEqual(parse_list(violation[1]),
+                         set(R.FD_LHS()[violation[0]].elements()))
+        if normal_form != 'BCNF':
+            self.assertEqual(violation[-1], expected[2])
+        if normal_form == '2NF':
+            key = parse_list(violation[2])
+            self.assertIn(key, naive_keys(R))
+            self.assertLess(parse_list(violation[1]), key)
+
+    def test_report(self):
+        rnd = random.Random(10)
+        for _ in range(300):
+            R = random_relation(rnd)
+            report = R.normal_form_report()
+            violations = naive_violations(R)
+            normal_form = 'BCNF'
+            for higher in NORMAL_FORMS[:0:-1]:
+                if any(found[0] == higher for found in violations):
+                    normal_form = NORMAL_FORMS[NORMAL_FORMS.index(higher) - 1]
+            self.assertEqual(report.get_normal_form(), normal_form)
+            self.assertEqual(R.highest_NF(), normal_form)
+            for normal_form in NORMAL_FORMS[1:]:
+                expected = [found for found in violations
+                            if found[0] == normal_form]
+                violation = report.get_violation(normal_form)
+                if not expected:
+                    self.assertIsNone(violation)
+                else:
+                    self.check_violation(R, normal_form, violation,
+                                         expected[0])
+
+    def test_round_trip(self):
+        rnd = random.Random(11)
+        for _ in range(100):
+            report = random_relation(rnd).normal_form_report()
+            copy = NormalFormReport.from_dict(report.to_dict())
+            self.assertEqual(copy.get_normal_form(), report.get_normal_form())
+            for normal_form in NORMAL_FORMS[1:]:
+                self.assertEqual(copy.get_violation(normal_form),
+                                 report.get_violation(normal_form))
+
+    def test_report_per_version(self):
+        R = Rel('A', 'B', 'C')
+        R.add_FD(['A'], ['B'])
+        self.assertEqual(R.highest_NF(), '1NF')
+        R.add_FD(['B'], ['C'])
+        R.add_FD(['C'], ['A'])
+        self.assertEqual(R.highest_NF(), 'BCNF')
+
+
+class TestViolations(unittest.TestCase):
+    """Every violation found in a single sweep over the FD's."""
+
+    def test_iter_violations(self):
+        rnd = random.Random(12)
+        for _ in range(300):
+            R = random_relation(rnd)
+            found = []
+            for normal_form, violation in R.iter_violations():
+                attr = None if normal_form == 'BCNF' else violation[-1]
+                found.append((normal_form, violation[0], attr))
+            self.assertEqual(found, naive_violations(R))
+
+    def test_all_violations(self):
+        rnd = random.Random(13)
+        for _ in range(200):
+            R = random_relation(rnd)
+            violations = R.all_violations()
+            self.assertEqual(sorted(violations), sorted(NORMAL_FORMS[1:]))
+            for normal_form in NORMAL_FORMS[1:]:
+                self.assertEqual(
+                    violations[normal_form],
+                    [violation for found, violation in R.iter_violations()
+                     if found == normal_form]
+                )
+
+    def test_cancelled(self):
+        R = Rel('A', 'B', 'C')
+        R.add_FD(['A'], ['B'])
+        token = CancelToken()
+        token.cancel()
+        with self.assertRaises(RelTimeout):
+            R.all_violations(token)
+        self.assertEqual(len(R.all_violations()['2NF']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import random
+import unittest
+
+from brute_force import random_relation
+from relation import CancelToken
+from relation import Rel
+from relation_UI import print_progress
+from relation_UI import run_with_progress
+
+
+def many_keys():
+    """Returns a relation with 64 candidate keys.
+
+    Returns:
+        (Rel): the relation
+    """
+    R = Rel(*[f'{attr}{i}' for i in range(6) for attr in 'AB'])
+    for i in range(6):
+        R.add_FD([f'A{i}'], [f'B{i}'])
+        R.add_FD([f'B{i}'], [f'A{i}'])
+    return R
+
+
+class TestProgress(unittest.TestCase):
+    """Progress reported to the callback of a cancellation token."""
+
+    def record(self, interval=0):
+        reports = []
+        token = CancelToken(
+            progress=lambda *report: reports.append(report),
+            interval=interval
+        )
+        return token, reports
+
+    def test_reports(self):
+        token, reports = self.record()
+        many_keys().keys(token)
+        rnd = random.Random(24)
+        for _ in range(50):
+            R = random_relation(rnd)
+            R.minimum_cover(token)
+            R.BCNF_decomposition(None, token)
+            R.BCNF_decomposition(True, token)
+            R.three_NF_decomposition(token)
+        phases = {phase for phase, _, _ in reports}
+        self.assertLessEqual({'keys', 'min_cover', 'BCNF_decomp'}, phases)
+        for phase, processed, total in reports:
+            self.assertLessEqual(0, processed)
+            self.assertLessEqual(processed, total)
+
+    def test_interval(self):
+        token, reports = self.record(3600)
+        many_keys().keys(token)
+        # Each phase is reported once per interval
+        self.assertEqual(len(reports), 1)
+        token.check('keys', 1, 2)
+        self.assertEqual(len(reports), 1)
+        token.check('min_cover', 1, 2)
+        self.assertEqual(len(reports), 2)
+
+
+class TestProgressBar(unittest.TestCase):
+    """Progress bars printed by the text interface."""
+
+    def test_print_progress(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            width = print_progress('keys', 1, 2)
+            self.assertEqual(print_progress('keys', 2, 2, 80), 80)
+        self.assertEqual([len(line) for line in
+                          output.getvalue().split('\r')], [0, width, 80])
+
+    def test_cleared(self):
+        def compute(token):
+            token.check('minimum_cover', 123456, 1234567)
+            token.check('keys', 1, 2)
+            return 'done'
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(run_with_progress(compute), 'done')
+        lines = output.getvalue().split('\r')
+        width = len(lines[1])
+        # The shorter line and the final clear cover the longest line
+        self.assertLess(len(lines[2].rstrip()), width)
+        self.assertEqual(len(lines[2]), width)
+        self.assertEqual(lines[3:], [width * ' ', ''])
+
+    def test_nothing_printed(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(run_with_progress(lambda token: 1), 1)
+        self.assertEqual(output.getvalue(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import random
+import unittest
+
+from brute_force import naive_closure
+from brute_force import random_relation
+from brute_force import subsets
+from set_theory import Set
+
+
+class TestProjection(unittest.TestCase):
+    """FD's inferred on a subset of the attributes."""
+
+    def test_infer_FD(self):
+        rnd = random.Random(5)
+        for _ in range(200):
+            R = random_relation(rnd, 8)
+            attrs = R.attributes_list()
+            projected = rnd.sample(attrs, rnd.randint(1, len(attrs)))
+            R_project = R.infer_FD(Set(*projected))
+            self.assertEqual(set(R_project.attributes_list()), set(projected))
+            for subset in subsets(sorted(projected)):
+                self.assertEqual(
+                    set(R_project.closure(Set(*subset)).elements()),
+                    naive_closure(R, subset) & set(projected)
+                )
+
+    def test_reduced_LHS(self):
+        rnd = random.Random(10)
+        for _ in range(200):
+            R = random_relation(rnd, 8)
+            attrs = R.attributes_list()
+            projected = rnd.sample(attrs, rnd.randint(1, len(attrs)))
+            R_project = R.infer_FD(Set(*projected))
+            FD_RHS = R_project.FD_RHS()
+            for index, LHS in enumerate(R_project.FD_LHS()):
+                # Each RHS attribute needs every attribute of the LHS
+                for attr in LHS.elements():
+                    rest = naive_closure(R, set(LHS.elements()) - {attr})
+                    for RHS_attr in FD_RHS[index].elements():
+                        self.assertNotIn(RHS_attr, rest)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import random
+import tempfile
+import threading
+import unittest
+
+from brute_force import random_relation
+from relation import Rel
+from results_cache import ResultsCache
+
+
+def shuffled(R, rnd):
+    """Returns a copy of R with its FD's split to a single RHS attribute
+    and added in a random order.
+
+    Parameters:
+        R(Rel): the relation
+        rnd(Random): the random number generator
+
+    Returns:
+        (Rel): the copy
+    """
+    R_copy = Rel(*R.attributes_list())
+    FD_list = []
+    FD_RHS = R.FD_RHS()
+    for index, LHS in enumerate(R.FD_LHS()):
+        for attr in FD_RHS[index].elements():
+            FD_list.append((LHS.elements(), [attr]))
+    rnd.shuffle(FD_list)
+    for LHS, RHS in FD_list:
+        R_copy.add_FD(LHS, RHS)
+    return R_copy
+
+
+class TestFingerprint(unittest.TestCase):
+    """Fingerprints of the attributes and FD's of a relation."""
+
+    def test_same_FD(self):
+        rnd = random.Random(17)
+        for _ in range(100):
+            R = random_relation(rnd)
+            R_copy = shuffled(R, rnd)
+            self.assertEqual(R_copy.fingerprint(), R.fingerprint())
+            self.assertEqual(R.copy().fingerprint(True),
+                             R.fingerprint(True))
+            self.assertNotEqual(R.fingerprint(True), R.fingerprint())
+
+    def test_changed_FD(self):
+        R = Rel('A', 'B', 'C')
+        R.add_FD(['A'], ['B'])
+        fingerprint = R.fingerprint()
+        R.add_FD(['B'], ['C'])
+        self.assertNotEqual(R.fingerprint(), fingerprint)
+        R.remove_FD(2)
+        self.assertEqual(R.fingerprint(), fingerprint)
+
+    def test_ordered(self):
+        R_1 = Rel('A', 'B', 'C')
+        R_1.add_FD(['A'], ['B'])
+        R_1.add_FD(['B'], ['C'])
+        R_2 = Rel('A', 'B', 'C')
+        R_2.add_FD(['B'], ['C'])
+        R_2.add_FD(['A'], ['B'])
+        self.assertEqual(R_1.fingerprint(), R_2.fingerprint())
+        self.assertNotEqual(R_1.fingerprint(True), R_2.fingerprint(True))
+
+
+class TestResultsCache(unittest.TestCase):
+    """Results of relations cached in a SQLite file."""
+
+    def setUp(self):
+        self.cache = ResultsCache(':memory:', 4)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_hit_miss(self):
+        self.assertIsNone(self.cache.get('R', 'keys'))
+        self.cache.put('R', 'keys', [['A'], ['B']])
+        self.assertEqual(self.cache.get('R', 'keys'), [['A'], ['B']])
+        self.assertEqual(self.cache.info(), (1, 1, 4, 1))
+
+    def test_evict(self):
+        for num in range(5):
+            self.cache.put(str(num), 'keys', num)
+        # The least recently used result is evicted first
+        self.assertIsNone(self.cache.get('0', 'keys'))
+        self.assertEqual(self.cache.get('1', 'keys'), 1)
+        self.cache.resize(2)
+        self.assertEqual(self.cache.info()[2:], (2, 2))
+        self.assertEqual(self.cache.get('1', 'keys'), 1)
+        self.assertIsNone(self.cache.get('2', 'keys'))
+
+    def test_shared_result(self):
+        rnd = random.Random(18)
+        R = random_relation(rnd)
+        R.set_results_cache(self.cache)
+        keys = R.keys()
+        self.assertEqual(self.cache.info()[:2], (0, 1))
+        R_copy = shuffled(R, rnd)
+        R_copy.set_results_cache(self.cache)
+        self.assertEqual(R_copy.keys(), keys)
+        self.assertEqual(self.cache.info()[:2], (1, 1))
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.sqlite3')
+            cache = ResultsCache(path)
+            cache.put('R', 'keys', [['A']])
+            cache.close()
+            cache = ResultsCache(path)
+            self.assertEqual(cache.get('R', 'keys'), [['A']])
+            cache.close()
+
+    def test_thread(self):
+        R = Rel('A', 'B', 'C')
+        R.add_FD(['A'], ['B'])
+        R.set_results_cache(self.cache)
+        results = []
+        thread = threading.Thread(target=lambda: results.append(R.keys()))
+        thread.start()
+        thread.join()
+        self.assertEqual(self.cache.info()[3], 1)
+        R_copy = R.copy()
+        R_copy.set_results_cache(self.cache)
+        self.assertEqual(R_copy.keys(), results[0])
+        self.assertEqual(self.cache.info()[:2], (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()